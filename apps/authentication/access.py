@@ -0,0 +1,105 @@
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+from apps.core.cache import LocalCache, broadcast_invalidation, bump_generation, get_generations
+
+from .models import UserTenantRole
+
+LOCAL_NAMESPACE = "authentication.tenant_permissions"
+EPOCH_LOCAL_NAMESPACE = "authentication.permission_epochs"
+GLOBAL_GENERATION = "permissions"
+
+
+class TenantAccess(NamedTuple):
+    """Compiled access of one user within one tenant."""
+
+    roles: frozenset[str]
+    permissions: frozenset[str]
+
+
+# (permission epoch, tenant_id, user_id) -> TenantAccess. A new epoch of the
+# tenant moves its users to new keys; the old entries age out.
+_local_access = LocalCache(LOCAL_NAMESPACE, ttl=settings.PERMISSION_LOCAL_CACHE_TTL)
+_local_epochs = LocalCache(EPOCH_LOCAL_NAMESPACE, ttl=settings.PERMISSION_LOCAL_CACHE_TTL)
+
+
+def get_tenant_access(user_id: int, tenant_id: int) -> TenantAccess:
+    """
+    Returns the role names and the effective "app_label.codename" permissions
+    of a user within a tenant. Both are compiled together once and kept in a
+    worker-local cache and in Redis under a key versioned by the tenant's
+    permission epoch, so any number of role and permission checks in a
+    request cost at most one cache fetch.
+    """
+    epoch = get_permission_epoch(tenant_id)
+    local_key = (epoch, tenant_id, user_id)
+    access = _local_access.get(local_key)
+    if access is not None:
+        return access  # type: ignore[no-any-return]
+
+    key = f"authentication:access:{epoch}:{tenant_id}:{user_id}"
+    access = cache.get(key)
+    if access is None:
+        access = _compile_access(user_id, tenant_id)
+        cache.set(key, access, settings.PERMISSION_CACHE_TIMEOUT)
+    _local_access.set(local_key, access)
+    return access  # type: ignore[no-any-return]
+
+
+def get_tenant_permissions(user_id: int, tenant_id: int) -> frozenset[str]:
+    return get_tenant_access(user_id, tenant_id).permissions
+
+
+def get_tenant_roles(user_id: int, tenant_id: int) -> frozenset[str]:
+    return get_tenant_access(user_id, tenant_id).roles
+
+
+def get_permission_epoch(tenant_id: int) -> str:
+    """
+    Returns the permission epoch of a tenant, made of the global and the
+    per-tenant generation. It changes whenever a permission of any user of
+    the tenant may have changed, and is embedded in tenant-scoped tokens.
+    """
+    epoch = _local_epochs.get(tenant_id)
+    if epoch is None:
+        global_generation, tenant_generation = get_generations(GLOBAL_GENERATION, _tenant_generation(tenant_id))
+        epoch = f"{global_generation}.{tenant_generation}"
+        _local_epochs.set(tenant_id, epoch)
+    return epoch  # type: ignore[no-any-return]
+
+
+def invalidate_tenant_permissions(tenant_id: int) -> None:
+    """Invalidates the compiled access of every user of one tenant."""
+    bump_generation(_tenant_generation(tenant_id))
+    # Dropping the epoch is enough: local access is keyed by it.
+    broadcast_invalidation(EPOCH_LOCAL_NAMESPACE, tenant_id)
+
+
+def invalidate_all_permissions() -> None:
+    """Invalidates compiled access everywhere, e.g. after a role changes."""
+    bump_generation(GLOBAL_GENERATION)
+    broadcast_invalidation(EPOCH_LOCAL_NAMESPACE)
+    broadcast_invalidation(LOCAL_NAMESPACE)
+
+
+def _compile_access(user_id: int, tenant_id: int) -> TenantAccess:
+    roles = UserTenantRole.objects.filter(
+        user_id=user_id,
+        tenant_id=tenant_id,
+        role__group__isnull=False,
+    ).values_list("role__group__name", flat=True)
+    perms = Permission.objects.filter(
+        rolepermission__role__usertenantrole__user_id=user_id,
+        rolepermission__role__usertenantrole__tenant_id=tenant_id,
+    ).values_list("content_type__app_label", "codename")
+    return TenantAccess(
+        roles=frozenset(roles),
+        permissions=frozenset(f"{app}.{codename}" for app, codename in perms),
+    )
+
+
+def _tenant_generation(tenant_id: int) -> str:
+    return f"permissions:tenant:{tenant_id}"
@@ -0,0 +1,202 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import Permission
+from django.utils import timezone
+
+from apps.core.cache import LocalCache, broadcast_invalidation
+from apps.tenancies.context import get_current_tenant
+from apps.tenancies.models import Tenant
+from apps.users.models import User
+
+from .hashing import run_password_hashing
+from .models import ApiKey, Role
+from .permission_bits import get_permission_bit_registry
+
+LOCAL_NAMESPACE = "authentication.api_keys"
+
+# HMAC of the full key -> ApiKeyUser. Only keys that passed the slow hash
+# check are cached, so a hit never needs to hash again.
+_local_api_keys = LocalCache(
+    LOCAL_NAMESPACE,
+    maxsize=settings.API_KEY_LOCAL_CACHE_SIZE,
+    ttl=settings.API_KEY_LOCAL_CACHE_TTL,
+)
+
+
+class ApiKeyUser:
+    """
+    request.user of a request authenticated with an API key. It stands for
+    the key rather than for a person: it has no pk and is granted exactly the
+    permissions of the key within the key's tenant.
+
+    Permissions are held as a bitmask of the permission bit registry, as in
+    tenant access tokens, so a check is one bit test. Permissions without a
+    bit, if any, are kept in a separate set.
+    """
+
+    __slots__ = (
+        "api_key_id",
+        "name",
+        "tenant_id",
+        "tenant_slug",
+        "roles",
+        "permission_mask",
+        "unmapped_permissions",
+        "expires_at",
+    )
+
+    pk = None
+    id = None
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    is_staff = False
+    is_superuser = False
+
+    def __init__(
+        self,
+        api_key_id: int,
+        name: str,
+        tenant_id: int,
+        tenant_slug: str,
+        roles: frozenset[str],
+        permissions: frozenset[str],
+        expires_at: datetime | None,
+    ) -> None:
+        registry = get_permission_bit_registry()
+        self.api_key_id = api_key_id
+        self.name = name
+        self.tenant_id = tenant_id
+        self.tenant_slug = tenant_slug
+        self.roles = roles
+        mapped = permissions.intersection(registry.bits)
+        self.permission_mask = registry.encode(mapped) or 0
+        self.unmapped_permissions = permissions - mapped
+        self.expires_at = expires_at
+
+    def __str__(self) -> str:
+        return f"API key {self.name}"
+
+    def get_username(self) -> str:
+        return str(self)
+
+    @property
+    def permissions(self) -> frozenset[str]:
+        return get_permission_bit_registry().decode(self.permission_mask) | self.unmapped_permissions
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= timezone.now()
+
+    def has_perm(self, perm: str, obj: Any | None = None) -> bool:
+        if obj is not None or not self._in_own_tenant():
+            return False
+        bit = get_permission_bit_registry().bits.get(perm)
+        if bit is None:
+            return perm in self.unmapped_permissions
+        return bool(self.permission_mask >> bit & 1)
+
+    def has_perms(self, perm_list: Iterable[str], obj: Any | None = None) -> bool:
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label: str) -> bool:
+        return self._in_own_tenant() and any(perm.startswith(f"{app_label}.") for perm in self.permissions)
+
+    def _in_own_tenant(self) -> bool:
+        tenant = get_current_tenant()
+        return tenant is not None and tenant.pk == self.tenant_id
+
+
+def create_api_key(
+    tenant: Tenant,
+    role: Role,
+    name: str,
+    scopes: Iterable[str] = (),
+    created_by: User | None = None,
+    expires_at: datetime | None = None,
+) -> tuple[ApiKey, str]:
+    """
+    Creates an API key and returns it together with the raw key, which is
+    not stored anywhere and cannot be recovered later.
+    """
+    prefix = secrets.token_hex(6)
+    raw_key = f"{prefix}.{secrets.token_urlsafe(32)}"
+    api_key = ApiKey.objects.create(
+        tenant=tenant,
+        role=role,
+        name=name,
+        prefix=prefix,
+        key_hash=make_password(raw_key),
+        scopes=sorted(scopes),
+        created_by=created_by,
+        expires_at=expires_at,
+    )
+    return api_key, raw_key
+
+
+def authenticate_api_key(raw_key: str) -> ApiKeyUser | None:
+    """
+    Returns the ApiKeyUser of a raw API key, or None if the key is unknown,
+    revoked or expired.
+
+    Keys are looked up in a worker-local LRU keyed by an HMAC of the full
+    key, so steady-state authentication costs one HMAC. On a miss the key
+    is found by its public prefix, checked against its slow hash on the
+    password hashing pool, and its tenant, roles and permissions are loaded
+    once for the cache entry.
+    """
+    digest = hmac.new(settings.SECRET_KEY.encode(), raw_key.encode(), hashlib.sha256).hexdigest()
+    user = _local_api_keys.get(digest)
+    if user is None:
+        user = _verify(raw_key)
+        if user is None:
+            return None
+        _local_api_keys.set(digest, user)
+    if user.is_expired:
+        return None
+    return user  # type: ignore[no-any-return]
+
+
+def invalidate_api_keys() -> None:
+    """Drops every verified key from the worker-local caches."""
+    broadcast_invalidation(LOCAL_NAMESPACE)
+
+
+def _verify(raw_key: str) -> ApiKeyUser | None:
+    prefix, separator, _ = raw_key.partition(".")
+    if not separator:
+        return None
+
+    api_key = (
+        ApiKey.objects.select_related("tenant", "role__group")
+        .filter(prefix=prefix, is_active=True, tenant__is_active=True)
+        .first()
+    )
+    # Only the slow hash runs on the pool; the queries stay on the request's connection.
+    if api_key is None or not run_password_hashing(check_password, raw_key, api_key.key_hash):
+        return None
+
+    permissions = frozenset(
+        f"{app}.{codename}"
+        for app, codename in Permission.objects.filter(rolepermission__role_id=api_key.role_id).values_list(
+            "content_type__app_label", "codename"
+        )
+    )
+    if api_key.scopes:
+        permissions &= frozenset(api_key.scopes)
+
+    return ApiKeyUser(
+        api_key_id=api_key.pk,
+        name=api_key.name,
+        tenant_id=api_key.tenant_id,  # type: ignore[attr-defined]
+        tenant_slug=api_key.tenant.slug,
+        roles=frozenset([api_key.role.group.name]) if api_key.role.group else frozenset(),
+        permissions=permissions,
+        expires_at=api_key.expires_at,
+    )
@@ -0,0 +1,145 @@
+from django.contrib.auth.models import AbstractBaseUser
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from apps.core.timing import timed
+from apps.tenancies.context import get_current_tenant, set_current_tenant
+from apps.tenancies.resolver import resolve_tenant
+from apps.users.snapshot import UserSnapshot, get_user_snapshot
+
+from .access import get_permission_epoch
+from .api_keys import ApiKeyUser, authenticate_api_key
+from .permission_bits import get_permission_bit_registry
+from .tokens import (
+    PERMISSION_EPOCH_CLAIM,
+    PERMISSION_REGISTRY_CLAIM,
+    PERMISSIONS_CLAIM,
+    TENANT_ID_CLAIM,
+    TENANT_SLUG_CLAIM,
+)
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that also understands tenant-scoped access tokens
+    (see TenantAccessToken). For those tokens it activates the token's
+    tenant when the request does not name one and, while the permission
+    epoch in the token is still current, hands the embedded permissions to
+    TenantRolePermissionBackend so no lookup is needed to authorize.
+
+    request.user is a cached UserSnapshot instead of a full User row; see
+    apps.users.snapshot for what it exposes.
+    """
+
+    @timed("auth")
+    def authenticate(  # type: ignore[override]
+        self, request: Request
+    ) -> tuple[UserSnapshot | AbstractBaseUser, Token] | None:
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        token = self._get_validated_token(request, raw_token)
+        user = self.get_user(token)
+        if token.get(TENANT_ID_CLAIM) is not None:
+            self._apply_tenant_claims(user, token)
+        return user, token
+
+    def _get_validated_token(self, request: Request, raw_token: bytes) -> Token:
+        # TenantMiddleware verified the same token to check the tenant membership.
+        validated = getattr(request, "validated_access_token", None)
+        if (
+            validated is not None
+            and validated[0].encode() == raw_token
+            and isinstance(validated[1], tuple(api_settings.AUTH_TOKEN_CLASSES))
+        ):
+            return validated[1]  # type: ignore[no-any-return]
+        return self.get_validated_token(raw_token)
+
+    def get_user(self, validated_token: Token) -> UserSnapshot | AbstractBaseUser:  # type: ignore[override]
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            # Revocation by password hash needs the full row.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_user_snapshot(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def _apply_tenant_claims(self, user: UserSnapshot | AbstractBaseUser, token: Token) -> None:
+        tenant_id = token[TENANT_ID_CLAIM]
+        tenant = get_current_tenant()
+        if tenant is None:
+            tenant = resolve_tenant(token.get(TENANT_SLUG_CLAIM))
+            if tenant is None or tenant.pk != tenant_id:
+                raise AuthenticationFailed(_("Token organization no longer exists."), code="token_not_valid")
+            set_current_tenant(tenant)
+        elif tenant.pk != tenant_id:
+            raise AuthenticationFailed(_("Token is not valid for this organization."), code="token_not_valid")
+
+        registry = get_permission_bit_registry()
+        if (
+            PERMISSIONS_CLAIM in token
+            and token.get(PERMISSION_REGISTRY_CLAIM) == registry.fingerprint
+            and token.get(PERMISSION_EPOCH_CLAIM) == get_permission_epoch(tenant_id)
+        ):
+            user._token_permissions = (  # type: ignore[attr-defined]
+                tenant_id,
+                registry.decode(int(token[PERMISSIONS_CLAIM], 16)),
+            )
+
+
+class ApiKeyAuthentication(BaseAuthentication):
+    """
+    Authenticates machine clients by a tenant-scoped API key sent as
+    "Authorization: Api-Key <key>". The key's tenant is activated when the
+    request does not name one; see apps.authentication.api_keys.
+    """
+
+    keyword = "Api-Key"
+
+    @timed("auth")
+    def authenticate(self, request: Request) -> tuple[ApiKeyUser, None] | None:  # type: ignore[override]
+        parts = get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(parts) != 2:
+            raise AuthenticationFailed(_("Invalid API key header."), code="api_key_not_valid")
+
+        try:
+            raw_key = parts[1].decode()
+        except UnicodeError as e:
+            raise AuthenticationFailed(_("Invalid API key header."), code="api_key_not_valid") from e
+
+        user = authenticate_api_key(raw_key)
+        if user is None:
+            raise AuthenticationFailed(_("Invalid or expired API key."), code="api_key_not_valid")
+
+        tenant = get_current_tenant()
+        if tenant is None:
+            tenant = resolve_tenant(user.tenant_slug)
+            if tenant is None or tenant.pk != user.tenant_id:
+                raise AuthenticationFailed(_("API key organization no longer exists."), code="api_key_not_valid")
+            set_current_tenant(tenant)
+        elif tenant.pk != user.tenant_id:
+            raise AuthenticationFailed(_("API key is not valid for this organization."), code="api_key_not_valid")
+        return user, None
+
+    def authenticate_header(self, request: Request) -> str:
+        return self.keyword
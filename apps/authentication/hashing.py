@@ -0,0 +1,55 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(max_workers=settings.LOGIN_HASHING_WORKERS, thread_name_prefix="login-hashing")
+# Hashing jobs admitted at once: the ones running plus the ones allowed to wait.
+_admission = threading.BoundedSemaphore(settings.LOGIN_HASHING_WORKERS + settings.LOGIN_HASHING_QUEUE_SIZE)
+
+
+class LoginCapacityExceeded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many login attempts in progress, please retry shortly.")
+    default_code = "login_capacity_exceeded"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.wait = settings.LOGIN_RETRY_AFTER
+
+
+def run_password_hashing(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs ``func`` (typically django.contrib.auth.authenticate) on the bounded
+    password hashing pool. At most LOGIN_HASHING_WORKERS hashes run at once,
+    so a burst of logins cannot take over the threads that serve every other
+    request. When the pool and its queue are full, the call is rejected with
+    503 instead of piling up.
+
+    ``func`` may query the database from a pool thread, whose connections
+    are closed around each call like those of a request thread, so
+    CONN_MAX_AGE and broken connections are handled there as well.
+    """
+    if not _admission.acquire(timeout=settings.LOGIN_ADMISSION_TIMEOUT):
+        raise LoginCapacityExceeded()
+    try:
+        context = contextvars.copy_context()
+        return _executor.submit(context.run, _with_db_connections, func, *args, **kwargs).result()
+    finally:
+        _admission.release()
+
+
+def _with_db_connections(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
@@ -0,0 +1,59 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from apps.authentication.views import UserLoginView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures login throughput by posting credentials to the login endpoint "
+        "from concurrent clients in-process. Throttling is disabled while it runs."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--email", required=True, help="Email of an existing active user.")
+        parser.add_argument("--password", required=True, help="Password of that user.")
+        parser.add_argument("--requests", type=int, default=200, help="Total login requests to send.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        total, concurrency = options["requests"], options["concurrency"]
+        body = {"email": options["email"], "password": options["password"]}
+        url = reverse("auth_login")
+
+        def login(_: int) -> tuple[int, float]:
+            client = Client()
+            started = time.perf_counter()
+            response = client.post(url, body, content_type="application/json")
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+        throttle_classes = UserLoginView.throttle_classes
+        UserLoginView.throttle_classes = []
+        try:
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                login(0)  # Warm up caches and connections.
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    results = list(executor.map(login, range(total)))
+                elapsed = time.perf_counter() - started
+        finally:
+            UserLoginView.throttle_classes = throttle_classes
+
+        latencies = sorted(duration for _, duration in results)
+        statuses = Counter(code for code, _ in results)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        self.stdout.write(f"Requests:    {total} ({concurrency} concurrent)")
+        self.stdout.write(f"Throughput:  {total / elapsed:.1f} logins/s")
+        self.stdout.write(
+            f"Latency:     p50 {quantiles[49]:.1f}ms  p95 {quantiles[94]:.1f}ms  "
+            f"p99 {quantiles[98]:.1f}ms  max {latencies[-1]:.1f}ms"
+        )
+        self.stdout.write(f"Statuses:    {dict(sorted(statuses.items()))}")
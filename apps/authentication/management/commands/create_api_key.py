@@ -0,0 +1,38 @@
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from apps.authentication.api_keys import create_api_key
+from apps.authentication.models import Role
+from apps.tenancies.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Creates a tenant-scoped API key and prints it. The key cannot be shown again."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--organization", required=True, help="Slug of the tenant the key belongs to.")
+        parser.add_argument("--role", required=True, help="Name of the system role (group) the key acts with.")
+        parser.add_argument("--name", required=True, help="Human readable name of the key.")
+        parser.add_argument(
+            "--scope",
+            action="append",
+            default=[],
+            help="Permission ('app_label.codename') to limit the key to. May be repeated.",
+        )
+        parser.add_argument("--expires-in-days", type=int, help="Days until the key expires.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            tenant = Tenant.objects.get(slug=options["organization"])
+            role = Role.objects.get(group__name=options["role"])
+        except (Tenant.DoesNotExist, Role.DoesNotExist) as e:
+            raise CommandError(str(e)) from e
+
+        expires_in_days = options["expires_in_days"]
+        expires_at = timezone.now() + timedelta(days=expires_in_days) if expires_in_days else None
+        api_key, raw_key = create_api_key(tenant, role, options["name"], options["scope"], expires_at=expires_at)
+        self.stdout.write(f"Created API key '{api_key}' for {tenant.slug}:")
+        self.stdout.write(raw_key)
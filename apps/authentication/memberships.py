@@ -0,0 +1,76 @@
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import LocalCache, broadcast_invalidation
+from apps.tenancies.serializers import TenantSerializer
+from apps.users.models import User
+
+from .models import UserTenantRole
+
+LOCAL_NAMESPACE = "authentication.memberships"
+
+_local_memberships = LocalCache(LOCAL_NAMESPACE, ttl=settings.MEMBERSHIP_LOCAL_CACHE_TTL)
+
+
+def get_user_memberships(user_id: int) -> dict[int, str]:
+    """
+    Returns the membership index of a user: the id and slug of every tenant
+    the user holds a role in. Kept in a worker-local cache and in Redis, and
+    rebuilt with a single query when UserTenantRole rows of the user change.
+    """
+    memberships = get_local_user_memberships(user_id)
+    if memberships is None:
+        key = _memberships_key(user_id)
+        pairs = cache.get(key)
+        if pairs is None:
+            pairs = tuple(
+                UserTenantRole.objects.filter(user_id=user_id)
+                .order_by("tenant__name")
+                .values_list("tenant_id", "tenant__slug")
+            )
+            cache.set(key, pairs, settings.MEMBERSHIP_CACHE_TIMEOUT)
+        memberships = dict(pairs)
+        _local_memberships.set(int(user_id), memberships)
+    return memberships
+
+
+def get_local_user_memberships(user_id: int) -> dict[int, str] | None:
+    """Returns the membership index only if this worker has it cached."""
+    return _local_memberships.get(int(user_id))  # type: ignore[no-any-return]
+
+
+def is_member(user_id: int, tenant_id: int) -> bool:
+    return tenant_id in get_user_memberships(user_id)
+
+
+def get_user_organizations(user: User) -> list[dict[str, Any]]:
+    """
+    Returns the serialized organizations (TenantSerializer) of a user, as
+    listed in the login response. Cached per user until the user's roles or
+    one of their tenants change.
+    """
+    key = _organizations_key(user.pk)
+    organizations = cache.get(key)
+    if organizations is None:
+        organizations = [dict(item) for item in TenantSerializer(user.get_tenants(), many=True).data]
+        cache.set(key, organizations, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return organizations  # type: ignore[no-any-return]
+
+
+def invalidate_user_memberships(user_ids: Iterable[int]) -> None:
+    user_ids = [int(user_id) for user_id in user_ids]
+    cache.delete_many(
+        [_memberships_key(user_id) for user_id in user_ids] + [_organizations_key(user_id) for user_id in user_ids]
+    )
+    for user_id in user_ids:
+        broadcast_invalidation(LOCAL_NAMESPACE, user_id)
+
+
+def _memberships_key(user_id: int) -> str:
+    return f"authentication:memberships:{user_id}"
+
+
+def _organizations_key(user_id: int) -> str:
+    return f"authentication:organizations:{user_id}"
@@ -128,3 +128,45 @@ class Invitation(TimestampedModel):
             models.Index(fields=["tenant"], name="idx_invitations_tenant_id"),
             models.Index(fields=["department"], name="idx_invit_dep_id"),
         ]
+
+
+class ApiKey(TimestampedModel):
+    """
+    Tenant-scoped API key for machine clients. Only a short public prefix and
+    a slow hash of the key are stored; the key itself is shown once, when it
+    is created. The key acts with the permissions of its role, optionally
+    narrowed down to its scopes.
+    Corresponds to the 'api_keys' table.
+    """
+
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, verbose_name=_("tenant"))
+    role = models.ForeignKey(Role, on_delete=models.PROTECT, verbose_name=_("role"))
+    name = models.CharField(_("name"), max_length=100)
+    prefix = models.CharField(_("prefix"), max_length=16, unique=True)
+    key_hash = models.CharField(_("key hash"), max_length=128)
+    scopes = models.JSONField(
+        _("scopes"),
+        default=list,
+        blank=True,
+        help_text=_("Permissions ('app_label.codename') the key is limited to. Empty means all of its role."),
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("created by"),
+    )
+    is_active = models.BooleanField(_("is active"), default=True)
+    expires_at = models.DateTimeField(_("expires at"), null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.prefix})"
+
+    class Meta:
+        db_table = "api_keys"
+        verbose_name = _("API key")
+        verbose_name_plural = _("API keys")
+        indexes = [
+            models.Index(fields=["tenant"], name="idx_api_keys_tenant_id"),
+        ]
@@ -0,0 +1,53 @@
+import hashlib
+from functools import lru_cache
+from typing import Iterable
+
+from .utils import get_permission_to_model_map
+
+MAX_PERMISSION_BITS = 128
+
+
+class PermissionBitRegistry:
+    """
+    Assigns a fixed bit to every permission of get_permission_to_model_map(),
+    following the order of the map. New codenames must be appended at the
+    end of the map; the fingerprint changes whenever the order does, so
+    masks issued with an older registry are never decoded with a newer one.
+    """
+
+    __slots__ = ("bits", "names", "fingerprint")
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = tuple(names)
+        if len(self.names) > MAX_PERMISSION_BITS:
+            raise ValueError(f"Permission registry exceeds {MAX_PERMISSION_BITS} bits ({len(self.names)}).")
+        self.bits = {name: bit for bit, name in enumerate(self.names)}
+        self.fingerprint = hashlib.sha256("\n".join(self.names).encode()).hexdigest()[:12]
+
+    def encode(self, permissions: Iterable[str]) -> int | None:
+        """
+        Returns the bitmask of ``permissions``, or None when one of them has
+        no bit assigned and the mask could not represent the set faithfully.
+        """
+        mask = 0
+        for permission in permissions:
+            bit = self.bits.get(permission)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def decode(self, mask: int) -> frozenset[str]:
+        return _decode(self, mask)
+
+
+@lru_cache(maxsize=1024)
+def _decode(registry: PermissionBitRegistry, mask: int) -> frozenset[str]:
+    return frozenset(name for bit, name in enumerate(registry.names) if mask >> bit & 1)
+
+
+@lru_cache(maxsize=1)
+def get_permission_bit_registry() -> PermissionBitRegistry:
+    return PermissionBitRegistry(
+        f"{model._meta.app_label}.{codename}" for codename, model in get_permission_to_model_map().items()
+    )
@@ -4,6 +4,11 @@ from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
+from apps.tenancies.resolver import resolve_tenant
+
+from .hashing import run_password_hashing
+from .memberships import is_member
+
 
 class UserLoginSerializer(serializers.Serializer):
     """
@@ -26,7 +31,7 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError(_("Email and password are required."), code="authorization")
 
         request = self.context.get("request")
-        user = authenticate(request=request, email=email, password=password)
+        user = run_password_hashing(authenticate, request=request, email=email, password=password)
 
         if not user:
             raise serializers.ValidationError(_("Unable to log in with provided credentials."), code="authorization")
@@ -36,3 +41,20 @@ class UserLoginSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class TenantTokenSerializer(serializers.Serializer):
+    """
+    Serializer to validate the organization a tenant-scoped token is
+    requested for. The authenticated user must belong to it.
+    """
+
+    organization = serializers.SlugField(label=_("Organization"), max_length=100, write_only=True)
+
+    def validate_organization(self, value: str) -> Any:
+        tenant = resolve_tenant(value)
+        user = self.context["request"].user
+        # API keys have no user and are already scoped to their tenant.
+        if tenant is None or user.pk is None or not is_member(user.pk, tenant.pk):
+            raise serializers.ValidationError(_("Organization not found."), code="not_found")
+        return tenant
@@ -2,73 +2,210 @@ import logging
 from typing import Any, Type
 
 from django.apps import AppConfig
+from django.apps import apps as django_apps
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_migrate
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Role
+from apps.tenancies.models import Tenant
+
+from .access import invalidate_all_permissions, invalidate_tenant_permissions
+from .api_keys import invalidate_api_keys
+from .memberships import invalidate_user_memberships
+from .models import ApiKey, Role, RolePermission, UserTenantRole
 from .utils import get_group_permissions, get_permission_to_model_map
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_migrate)
-def create_groups_with_permissions(sender: Type[AppConfig], **kwargs: Any) -> None:
+@receiver(post_migrate, sender=django_apps.get_app_config("authentication"))
+def create_groups_with_permissions(sender: AppConfig, using: str = DEFAULT_DB_ALIAS, **kwargs: Any) -> None:
     """
-    Signal runs after each migration to create and assign
+    Signal runs once per migrate (for this app only) to create and assign
     groups (roles) and permissions.
 
     Each permission is associated with its corresponding model,
-    covering the business logic and the provided models.
+    covering the business logic and the provided models. The current state
+    is read in bulk and only the missing or stale rows are written, so a
+    migrate with nothing to change costs a handful of queries.
     """
 
     group_permissions = get_group_permissions()
     permission_to_model_map = get_permission_to_model_map()
     logger.info("Starting group and role creation/update...")
 
-    for group_name, perm_codenames in group_permissions.items():
-        group, group_created = Group.objects.get_or_create(name=group_name)
-        if group_created:
-            logger.info(f"Group '{group_name}' created.")
+    permission_ids = _sync_permissions(permission_to_model_map, using)
+    groups = _sync_groups(group_permissions, using)
+    roles = _sync_roles(groups, using)
 
-        permissions_for_group = []
+    wanted: dict[int, set[int]] = {}
+    for group_name, perm_codenames in group_permissions.items():
+        group_permission_ids = wanted.setdefault(groups[group_name].pk, set())
         for codename in perm_codenames:
-            model_class = permission_to_model_map.get(codename)
-            if not model_class:
+            if codename not in permission_ids:
                 logger.warning(f"Permission '{codename}' in group '{group_name}' has no model mapped. Skipping.")
                 continue
+            group_permission_ids.add(permission_ids[codename])
+
+    _sync_links(Group.permissions.through, "group_id", wanted, using)
+    role_wanted = {roles[group_id].pk: permission_ids for group_id, permission_ids in wanted.items()}
+    if _sync_links(RolePermission, "role_id", role_wanted, using):
+        transaction.on_commit(_invalidate_role_access, using=using)
+        logger.debug("Permissions of system roles synchronized with their groups.")
+
+    logger.info("Finished creating/syncing groups and roles.")
+
+
+def _sync_permissions(permission_to_model_map: dict[str, Type[Model]], using: str) -> dict[str, int]:
+    """Returns the permission id of every mapped codename, creating the missing ones."""
+    content_types = ContentType.objects.db_manager(using).get_for_models(*set(permission_to_model_map.values()))
+    wanted = {(content_types[model].pk, codename): codename for codename, model in permission_to_model_map.items()}
 
-            try:
-                content_type = ContentType.objects.get_for_model(model_class)
-                permission = Permission.objects.get(codename=codename, content_type=content_type)
-                permissions_for_group.append(permission)
-            except Permission.DoesNotExist:
-                permission = Permission.objects.create(
-                    codename=codename,
-                    name=f"Can {codename.replace('_', ' ')}",
-                    content_type=content_type,
-                )
-                permissions_for_group.append(permission)
-                logger.debug(f"  Permission '{codename}' created for model '{model_class._meta.model_name}'.")
-            except Exception as e:
-                logger.error(f"Could not get/create permission '{codename}'. Error: {e}")
-
-        group.permissions.set(permissions_for_group)
-        role, role_created = Role.objects.update_or_create(
-            group=group,
-            defaults={
-                "group": group,
-                "description": f"System role corresponding to the '{group_name}' group.",
-            },
+    def existing() -> dict[tuple[int, str], int]:
+        permissions = Permission.objects.using(using).filter(
+            content_type__in=content_types.values(), codename__in=permission_to_model_map
         )
+        return {
+            (content_type_id, codename): pk
+            for pk, content_type_id, codename in permissions.values_list("pk", "content_type_id", "codename")
+        }
 
-        if role_created:
-            logger.info(f"System Role '{group_name}' created and linked to Group.")
-        else:
-            logger.debug(f"System Role '{group_name}' found and updated.")
+    permissions = existing()
+    missing = [
+        Permission(codename=codename, name=f"Can {codename.replace('_', ' ')}", content_type_id=content_type_id)
+        for (content_type_id, codename) in wanted.keys() - permissions.keys()
+    ]
+    if missing:
+        Permission.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+        permissions = existing()
+        logger.debug(f"  Created permissions: {', '.join(sorted(p.codename for p in missing))}.")
 
-        role.permissions.set(group.permissions.all())
-        logger.debug(f"  Permissions for Role '{group_name}' synchronized with Group.")
+    return {codename: permissions[key] for key, codename in wanted.items() if key in permissions}
 
-    logger.info("Finished creating/syncing groups and roles.")
+
+def _sync_groups(group_permissions: dict[str, list[str]], using: str) -> dict[str, Group]:
+    groups = {group.name: group for group in Group.objects.using(using).filter(name__in=group_permissions)}
+    missing = [Group(name=name) for name in group_permissions if name not in groups]
+    if missing:
+        Group.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+        groups = {group.name: group for group in Group.objects.using(using).filter(name__in=group_permissions)}
+        for group in missing:
+            logger.info(f"Group '{group.name}' created.")
+    return groups
+
+
+def _sync_roles(groups: dict[str, Group], using: str) -> dict[int, Role]:
+    """Returns the system role of every group, keyed by group id."""
+    names = {group.pk: name for name, group in groups.items()}
+    descriptions = {group_id: f"System role corresponding to the '{name}' group." for group_id, name in names.items()}
+
+    roles: dict[int, Role] = {}
+    for role in Role.objects.using(using).filter(group_id__in=descriptions).order_by("pk"):
+        roles.setdefault(role.group_id, role)  # type: ignore[attr-defined]
+
+    stale = [role for group_id, role in roles.items() if role.description != descriptions[group_id]]
+    for role in stale:
+        role.description = descriptions[role.group_id]  # type: ignore[attr-defined]
+        role.updated_at = timezone.now()
+    if stale:
+        Role.objects.using(using).bulk_update(stale, ["description", "updated_at"])
+
+    missing = [group_id for group_id in descriptions if group_id not in roles]
+    if missing:
+        Role.objects.using(using).bulk_create(
+            [Role(group_id=group_id, description=descriptions[group_id]) for group_id in missing]
+        )
+        for role in Role.objects.using(using).filter(group_id__in=missing):
+            roles.setdefault(role.group_id, role)  # type: ignore[attr-defined]
+            logger.info(f"System Role '{names[role.group_id]}' created and linked to Group.")
+    return roles
+
+
+def _sync_links(through: Type[Model], owner_field: str, wanted: dict[int, set[int]], using: str) -> bool:
+    """
+    Makes the permission rows of every owner in a many-to-many through table
+    match ``wanted`` (owner id -> permission ids), touching only the rows
+    that differ. Returns whether anything changed.
+    """
+    rows = through.objects.using(using).filter(**{f"{owner_field}__in": wanted})  # type: ignore[attr-defined]
+    existing = {
+        (owner_id, permission_id): pk
+        for pk, owner_id, permission_id in rows.values_list("pk", owner_field, "permission_id")
+    }
+    desired = {
+        (owner_id, permission_id) for owner_id, permission_ids in wanted.items() for permission_id in permission_ids
+    }
+
+    stale = [pk for key, pk in existing.items() if key not in desired]
+    missing = desired - existing.keys()
+    if stale:
+        through.objects.using(using).filter(pk__in=stale).delete()  # type: ignore[attr-defined]
+    if missing:
+        through.objects.using(using).bulk_create(  # type: ignore[attr-defined]
+            [through(**{owner_field: owner_id, "permission_id": permission_id}) for owner_id, permission_id in missing]
+        )
+    return bool(stale or missing)
+
+
+@receiver(post_save, sender=UserTenantRole)
+@receiver(post_delete, sender=UserTenantRole)
+def invalidate_user_tenant_role_permissions(
+    sender: Type[UserTenantRole], instance: UserTenantRole, **kwargs: Any
+) -> None:
+    tenant_id, user_id = instance.tenant_id, instance.user_id
+
+    def invalidate() -> None:
+        invalidate_tenant_permissions(tenant_id)
+        invalidate_user_memberships([user_id])
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_memberships(sender: Type[Tenant], instance: Tenant, **kwargs: Any) -> None:
+    """
+    The cached organization lists embed the tenant name and slug, and
+    verified API keys are only valid while their tenant is active.
+    """
+    user_ids = list(UserTenantRole.objects.filter(tenant_id=instance.pk).values_list("user_id", flat=True))
+
+    def invalidate() -> None:
+        invalidate_user_memberships(user_ids)
+        invalidate_api_keys()
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(m2m_changed, sender=RolePermission)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_role_permissions(sender: Type[Role] | Type[RolePermission] | Type[Group], **kwargs: Any) -> None:
+    """
+    Roles are shared between tenants, so any change to a role, to its group
+    (which names it) or to its permissions invalidates the compiled access of
+    every tenant and every verified API key.
+    """
+    action = kwargs.get("action")
+    if action is not None and not action.startswith("post_"):
+        return
+    transaction.on_commit(_invalidate_role_access)
+
+
+@receiver(post_save, sender=ApiKey)
+@receiver(post_delete, sender=ApiKey)
+def invalidate_api_key(sender: Type[ApiKey], **kwargs: Any) -> None:
+    transaction.on_commit(invalidate_api_keys)
+
+
+def _invalidate_role_access() -> None:
+    invalidate_all_permissions()
+    invalidate_api_keys()
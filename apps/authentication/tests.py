@@ -0,0 +1,31 @@
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+
+from apps.tenancies.models import Tenant
+
+from .api_keys import create_api_key, invalidate_api_keys
+from .models import Role
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class ApiKeyRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.tenant = Tenant.objects.create(name="Acme", slug="acme")
+        cls.role = Role.objects.create(group=Group.objects.create(name="Integration"))
+
+    def setUp(self) -> None:
+        invalidate_api_keys()
+        _, self.raw_key = create_api_key(self.tenant, self.role, name="ci")
+
+    def test_api_key_request_passes_middleware(self) -> None:
+        with self.assertLogs("django.request", level="INFO") as logs:
+            response = self.client.post(
+                "/api/v1/auth/tenant-token",
+                {"organization": self.tenant.slug},
+                content_type="application/json",
+                headers={"authorization": f"Api-Key {self.raw_key}"},
+            )
+        self.assertEqual(response.status_code, 400)
+        access_log = next(record for record in logs.records if record.msg.startswith("%s %s"))
+        self.assertEqual(getattr(access_log, "user", None), "API key ci")
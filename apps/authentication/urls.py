@@ -1,9 +1,10 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from .views import UserLoginView
+from .views import TenantTokenView, UserLoginView
 
 urlpatterns = [
     path("login", UserLoginView.as_view(), name="auth_login"),
     path("refresh", TokenRefreshView.as_view(), name="auth_refresh"),
+    path("tenant-token", TenantTokenView.as_view(), name="auth_tenant_token"),
 ]
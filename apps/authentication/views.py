@@ -1,8 +1,5 @@
 from typing import Any
 
-from decouple import config
-from django.core.cache import cache
-from django.utils.timezone import now
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
@@ -11,9 +8,12 @@ from rest_framework.serializers import Serializer
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.core.utils import envelope
 from apps.tenancies.serializers import TenantSerializer
 
-from .serializers import UserLoginSerializer
+from .memberships import get_user_organizations
+from .serializers import TenantTokenSerializer, UserLoginSerializer
+from .tokens import TenantAccessToken
 
 
 class UserLoginView(APIView):
@@ -21,6 +21,8 @@ class UserLoginView(APIView):
     User login view.
     Receives email and password, returns JWT access and refresh tokens,
     and a list of tenants the user belongs to.
+    Password hashing runs on a bounded pool (see hashing.py), and neither the
+    organization list nor the token minting queries the database once warm.
     """
 
     permission_classes = [AllowAny]
@@ -29,31 +31,17 @@ class UserLoginView(APIView):
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        email = request.data.get("email", "")
-        password = request.data.get("password", "")
-        cache_key = f"user_login:{email}:{password}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
 
         user = serializer.validated_data["user"]
         refresh = RefreshToken.for_user(user)
-        tenants = user.get_tenants()
-        tenant_serializer = TenantSerializer(tenants, many=True)
 
-        payload = {
-            "data": {
-                "organizations": tenant_serializer.data,
+        payload = envelope(
+            {
+                "organizations": get_user_organizations(user),
                 "accessToken": str(refresh.access_token),
                 "refreshToken": str(refresh),
-            },
-            "meta": {
-                "timestamp": now().isoformat(),
-                "apiVersion": config("API_DEFAULT_VERSION", default="v1"),
-            },
-        }
-
-        cache.set(cache_key, payload, config("CACHE_TIMEOUT", default=300, cast=int))
+            }
+        )
         return Response(payload, status=status.HTTP_200_OK)
 
     def get_serializer(self, *args: Any, **kwargs: Any) -> Serializer:
@@ -62,3 +50,27 @@ class UserLoginView(APIView):
 
     def get_serializer_context(self) -> dict[str, Any]:
         return {"request": self.request}
+
+
+class TenantTokenView(APIView):
+    """
+    Exchanges a regular access token for one scoped to an organization the
+    user belongs to. The scoped token carries the user's permissions in that
+    organization, so most requests can be authorized without lookups.
+    """
+
+    serializer_class = TenantTokenSerializer
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.serializer_class(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        tenant = serializer.validated_data["organization"]
+        access_token = TenantAccessToken.for_tenant(request.user, tenant)
+
+        payload = envelope(
+            {
+                "organization": TenantSerializer(tenant).data,
+                "accessToken": str(access_token),
+            }
+        )
+        return Response(payload, status=status.HTTP_200_OK)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0003_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="invoice",
+            name="idx_invoices_tenant_id",
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(fields=["tenant", "-created_at"], name="idx_invoices_tenant_created_at"),
+        ),
+    ]
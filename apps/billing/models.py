@@ -54,7 +54,7 @@ class Invoice(TimestampedModel):
         verbose_name_plural = _("invoices")
         unique_together = [["subscription", "period_end"]]
         indexes = [
-            models.Index(fields=["tenant"], name="idx_invoices_tenant_id"),
+            models.Index(fields=["tenant", "-created_at"], name="idx_invoices_tenant_created_at"),
             models.Index(fields=["status"], name="idx_invoices_status"),
         ]
 
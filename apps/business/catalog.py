@@ -0,0 +1,126 @@
+import time
+from collections import defaultdict
+from typing import Any
+
+from django.conf import settings
+
+from apps.core.cache import bump_generation, get_generations
+from apps.core.edge_cache import purge_surrogate_keys
+from apps.core.snapshot import MappedSnapshot, snapshot_lock, write_snapshot
+
+from .models import Feature, FeatureTier, Plan, PlanFeature, PlanPrice
+
+CATALOG_GENERATION = "catalog"
+# Surrogate key of every public catalog response.
+CATALOG_SURROGATE_KEY = "catalog"
+
+# Sections of the catalog snapshot and their keys.
+FEATURES = "features"  # codename
+PLANS = "plans"  # str(plan id)
+PLAN_PRICES = "plan_prices"  # str(plan price id)
+
+_snapshot = MappedSnapshot(settings.CATALOG_SNAPSHOT_PATH, check_interval=settings.CATALOG_SNAPSHOT_CHECK_INTERVAL)
+_next_generation_check = 0.0
+
+
+def get_catalog(min_version: int | None = None) -> MappedSnapshot:
+    """
+    Returns the catalog snapshot: features, plans with their feature values
+    and prices with their tiers. It is a memory-mapped file shared by every
+    worker of the host, so lookups need neither queries nor per-worker
+    copies.
+
+    The snapshot is rebuilt when it is missing or older than the catalog
+    generation, which is checked at most every CATALOG_SNAPSHOT_CHECK_INTERVAL
+    seconds, or right away when the caller needs at least ``min_version``.
+    One process of the host rebuilds it while the others keep serving the
+    current file, or wait for the new one when they cannot do without it.
+    """
+    global _next_generation_check
+
+    version = _snapshot.version
+    if min_version is not None and (version is None or version < min_version):
+        _snapshot.refresh()
+        version = _snapshot.version
+        if version is None or version < min_version:
+            _rebuild(min_version, wait=True)
+    elif version is None or time.monotonic() >= _next_generation_check:
+        _next_generation_check = time.monotonic() + settings.CATALOG_SNAPSHOT_CHECK_INTERVAL
+        (generation,) = get_generations(CATALOG_GENERATION)
+        if version is None or version < generation:
+            _rebuild(generation, wait=version is None)
+    return _snapshot
+
+
+def build_catalog_snapshot(version: int | None = None) -> int:
+    """Writes a snapshot of the current catalog and returns its version."""
+    if version is None:
+        (version,) = get_generations(CATALOG_GENERATION)
+    with snapshot_lock(settings.CATALOG_SNAPSHOT_PATH):
+        _write(version)
+    return version
+
+
+def invalidate_catalog() -> int:
+    """
+    Moves the catalog to a new generation, rebuilds the local snapshot and
+    purges the public catalog responses from the edge cache. Workers on
+    other hosts rebuild theirs on their next generation check.
+    """
+    version = build_catalog_snapshot(bump_generation(CATALOG_GENERATION))
+    purge_surrogate_keys(CATALOG_SURROGATE_KEY)
+    return version
+
+
+def build_catalog() -> dict[str, dict[str, Any]]:
+    plan_features: dict[int, dict[str, str]] = defaultdict(dict)
+    for plan_id, codename, value in PlanFeature.objects.values_list("plan_id", "feature__codename", "value"):
+        plan_features[plan_id][codename] = value
+
+    price_tiers: dict[int, dict[str, list[list[Any]]]] = defaultdict(lambda: defaultdict(list))
+    tiers = FeatureTier.objects.order_by("up_to").values_list(
+        "plan_price_id", "feature__codename", "up_to", "unit_price", "flat_fee", "currency"
+    )
+    for plan_price_id, codename, up_to, unit_price, flat_fee, currency in tiers:
+        price_tiers[plan_price_id][codename].append([up_to, str(unit_price), str(flat_fee), currency])
+
+    prices: dict[str, dict[str, Any]] = {}
+    plan_prices: dict[int, list[int]] = defaultdict(list)
+    for price in PlanPrice.objects.order_by("pk").values(
+        "id", "plan_id", "billing_period", "price_amount", "currency", "is_active"
+    ):
+        price["price_amount"] = str(price["price_amount"])
+        price["tiers"] = price_tiers.get(price["id"], {})
+        prices[str(price["id"])] = price
+        plan_prices[price["plan_id"]].append(price["id"])
+
+    plans: dict[str, dict[str, Any]] = {}
+    for plan in Plan.objects.values("id", "name", "description", "is_active"):
+        plan["features"] = plan_features.get(plan["id"], {})
+        plan["prices"] = plan_prices.get(plan["id"], [])
+        plans[str(plan["id"])] = plan
+
+    return {
+        FEATURES: {
+            feature["codename"]: feature
+            for feature in Feature.objects.values("id", "codename", "description", "type", "value_type")
+        },
+        PLANS: plans,
+        PLAN_PRICES: prices,
+    }
+
+
+def _rebuild(version: int, wait: bool) -> None:
+    """Rebuilds a snapshot older than ``version``, unless another process is, and ``wait`` is false."""
+    with snapshot_lock(settings.CATALOG_SNAPSHOT_PATH, blocking=wait) as locked:
+        if not locked:
+            return
+        # The process that held the lock may have written it already.
+        _snapshot.refresh()
+        if _snapshot.version is None or _snapshot.version < version:
+            _write(version)
+
+
+def _write(version: int) -> None:
+    write_snapshot(settings.CATALOG_SNAPSHOT_PATH, build_catalog(), version)
+    _snapshot.refresh(force=True)
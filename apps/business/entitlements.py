@@ -0,0 +1,165 @@
+import logging
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import LocalCache, broadcast_invalidation, bump_generation, get_generations
+from apps.tenancies.models import Tenant
+
+from .catalog import CATALOG_GENERATION, FEATURES, PLAN_PRICES, PLANS, get_catalog, invalidate_catalog
+from .models import Feature, Subscription
+
+logger = logging.getLogger(__name__)
+
+LOCAL_NAMESPACE = "business.entitlements"
+# Plans and features live in the catalog, so its generation stamps every snapshot.
+GLOBAL_GENERATION = CATALOG_GENERATION
+CURRENT_STATUSES = (Subscription.Status.ACTIVE, Subscription.Status.TRIALING)
+TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
+
+
+class Tier(NamedTuple):
+    up_to: int
+    unit_price: Decimal
+    flat_fee: Decimal
+    currency: str
+
+
+# bool for on/off features, int for limits, str for text values and the
+# ordered tier table of metered features.
+EntitlementValue = Union[bool, int, str, tuple[Tier, ...]]
+
+
+class Entitlements:
+    """
+    Immutable snapshot of what a tenant's current subscription grants,
+    mapping feature codenames to values parsed once from PlanFeature.value.
+    ``version`` is the generation stamp the snapshot was compiled under.
+    """
+
+    __slots__ = ("version", "plan_id", "features")
+
+    version: str
+    plan_id: int | None
+    features: Mapping[str, EntitlementValue]
+
+    def __init__(self, version: str, plan_id: int | None, features: Mapping[str, EntitlementValue]) -> None:
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "plan_id", plan_id)
+        object.__setattr__(self, "features", MappingProxyType(dict(features)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Entitlements are immutable")
+
+    def __reduce__(self) -> tuple[type["Entitlements"], tuple[str, int | None, dict[str, EntitlementValue]]]:
+        return Entitlements, (self.version, self.plan_id, dict(self.features))
+
+    def __contains__(self, codename: str) -> bool:
+        return codename in self.features
+
+    def __repr__(self) -> str:
+        return f"Entitlements(version={self.version!r}, plan_id={self.plan_id}, features={dict(self.features)!r})"
+
+    def get(self, codename: str, default: EntitlementValue | None = None) -> EntitlementValue | None:
+        return self.features.get(codename, default)
+
+    def allows(self, codename: str) -> bool:
+        """Whether the feature is granted: enabled, with a positive limit, or metered."""
+        value = self.features.get(codename)
+        if isinstance(value, (bool, str)):
+            return bool(value)
+        if isinstance(value, int):
+            return value > 0
+        return value is not None
+
+
+_local_entitlements = LocalCache(LOCAL_NAMESPACE, ttl=settings.ENTITLEMENT_LOCAL_CACHE_TTL)
+
+
+def get_entitlements(tenant: Tenant) -> Entitlements:
+    """
+    Returns the compiled entitlements of a tenant. Snapshots are kept in a
+    worker-local cache and in Redis under a key versioned by the global and
+    the per-tenant entitlement generation, and are recompiled only after a
+    subscription, plan or feature change. Compiling reads the plan from the
+    catalog snapshot and queries only the subscription.
+    """
+    entitlements = _local_entitlements.get(tenant.pk)
+    if entitlements is None:
+        global_generation, tenant_generation = get_generations(GLOBAL_GENERATION, _tenant_generation(tenant.pk))
+        version = f"{global_generation}.{tenant_generation}"
+        key = f"business:entitlements:{version}:{tenant.pk}"
+        entitlements = cache.get(key)
+        if entitlements is None:
+            entitlements = _compile(tenant.pk, version, global_generation)
+            cache.set(key, entitlements, settings.ENTITLEMENT_CACHE_TIMEOUT)
+        _local_entitlements.set(tenant.pk, entitlements)
+    return entitlements  # type: ignore[no-any-return]
+
+
+def check(tenant: Tenant, codename: str, default: EntitlementValue | None = None) -> EntitlementValue | None:
+    """
+    Returns the value of a feature for a tenant, e.g.
+    ``entitlements.check(tenant, "max_users") -> 25``, or ``default`` when
+    the tenant's plan does not include it.
+    """
+    return get_entitlements(tenant).get(codename, default)
+
+
+def invalidate_tenant_entitlements(tenant_id: int) -> None:
+    bump_generation(_tenant_generation(tenant_id))
+    broadcast_invalidation(LOCAL_NAMESPACE, tenant_id)
+
+
+def invalidate_all_entitlements() -> None:
+    """Rebuilds the catalog under a new generation after a plan or feature change."""
+    invalidate_catalog()
+    broadcast_invalidation(LOCAL_NAMESPACE)
+
+
+def _compile(tenant_id: int, version: str, catalog_version: int) -> Entitlements:
+    subscription = (
+        Subscription.objects.filter(tenant_id=tenant_id, status__in=CURRENT_STATUSES)
+        .order_by("-current_period_starts_at")
+        .values("plan_id", "plan_price_id")
+        .first()
+    )
+    if subscription is None:
+        return Entitlements(version, None, {})
+
+    catalog = get_catalog(min_version=catalog_version)
+    plan = catalog.get(PLANS, str(subscription["plan_id"]), {})
+    price = catalog.get(PLAN_PRICES, str(subscription["plan_price_id"]), {})
+
+    features: dict[str, EntitlementValue] = {}
+    for codename, value in plan.get("features", {}).items():
+        feature = catalog.get(FEATURES, codename)
+        if feature is None:
+            continue
+        if feature["type"] == Feature.FeatureType.METERED:
+            features[codename] = tuple(
+                Tier(up_to, Decimal(unit_price), Decimal(flat_fee), currency)
+                for up_to, unit_price, flat_fee, currency in price.get("tiers", {}).get(codename, ())
+            )
+            continue
+        try:
+            features[codename] = _parse(feature["value_type"], value)
+        except ValueError:
+            logger.warning(f"Invalid value {value!r} of feature '{codename}' in plan {subscription['plan_id']}.")
+
+    return Entitlements(version, subscription["plan_id"], features)
+
+
+def _parse(value_type: str, value: str) -> bool | int | str:
+    if value_type == Feature.ValueType.BOOLEAN:
+        return value.strip().lower() in TRUE_VALUES
+    if value_type == Feature.ValueType.INTEGER:
+        return int(value)
+    return value
+
+
+def _tenant_generation(tenant_id: int) -> str:
+    return f"entitlements:tenant:{tenant_id}"
@@ -0,0 +1,23 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.business.catalog import build_catalog_snapshot, invalidate_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the memory-mapped catalog snapshot (plans, prices, features) "
+        "shared by the workers of this host. Run it on deploy, before starting the workers."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--bump",
+            action="store_true",
+            help="Move the catalog to a new generation, so workers on every host rebuild their snapshot.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        version = invalidate_catalog() if options["bump"] else build_catalog_snapshot()
+        self.stdout.write(f"Catalog snapshot version {version} written.")
@@ -0,0 +1,33 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .entitlements import invalidate_all_entitlements, invalidate_tenant_entitlements
+from .models import Feature, FeatureTier, Plan, PlanFeature, PlanPrice, Subscription
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscription_entitlements(sender: type[Subscription], instance: Subscription, **kwargs: Any) -> None:
+    tenant_id = instance.tenant_id  # type: ignore[attr-defined]
+    transaction.on_commit(lambda: invalidate_tenant_entitlements(tenant_id))
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+@receiver(post_save, sender=PlanPrice)
+@receiver(post_delete, sender=PlanPrice)
+@receiver(post_save, sender=PlanFeature)
+@receiver(post_delete, sender=PlanFeature)
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+@receiver(post_save, sender=FeatureTier)
+@receiver(post_delete, sender=FeatureTier)
+def invalidate_plan_entitlements(sender: type[Any], **kwargs: Any) -> None:
+    """
+    Plans are shared between tenants, so a catalog change rebuilds the
+    catalog snapshot and recompiles the entitlements of every tenant.
+    """
+    transaction.on_commit(invalidate_all_entitlements)
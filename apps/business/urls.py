@@ -0,0 +1,11 @@
+from django.urls import path
+
+from .views import FeatureCatalogView, PlanCatalogView, PriceCatalogView
+
+app_name = "catalog"
+
+urlpatterns = [
+    path("plans", PlanCatalogView.as_view(), name="plans"),
+    path("prices", PriceCatalogView.as_view(), name="prices"),
+    path("features", FeatureCatalogView.as_view(), name="features"),
+]
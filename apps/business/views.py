@@ -0,0 +1,85 @@
+from typing import Any
+
+from django.conf import settings
+from django.http import HttpResponseBase, HttpResponseNotModified
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.edge_cache import public_cache
+from apps.core.response_cache import etag_matches
+from apps.core.snapshot import MappedSnapshot
+
+from .catalog import CATALOG_SURROGATE_KEY, FEATURES, PLAN_PRICES, PLANS, get_catalog
+
+
+class CatalogView(APIView):
+    """
+    Base view of the public catalog endpoints. The data comes from the
+    catalog snapshot and is the same for every client, so responses are
+    cacheable by nginx or a CDN: requests carrying the current catalog
+    version (``?v=<catalogVersion>``) are cached for long, the others
+    briefly, and every response is tagged with surrogate keys that are
+    purged when the catalog changes. The ETag is the catalog version.
+
+    Lists the values of ``section`` unless get_data is overridden.
+    """
+
+    authentication_classes: list[Any] = []
+    permission_classes = [AllowAny]
+    section: str = ""
+    surrogate_key: str = ""
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        catalog = get_catalog()
+        etag = f'W/"catalog-{catalog.version}"'
+        if request.query_params.get("v") == str(catalog.version):
+            max_age = settings.CATALOG_VERSIONED_CACHE_MAX_AGE
+        else:
+            max_age = settings.CATALOG_CACHE_MAX_AGE
+
+        if etag_matches(etag, request.headers.get("If-None-Match", "")):
+            response: HttpResponseBase = HttpResponseNotModified()
+        else:
+            response = Response({"data": self.get_data(catalog), "meta": {"catalogVersion": catalog.version}})
+        response["ETag"] = etag
+        return public_cache(response, (CATALOG_SURROGATE_KEY, self.surrogate_key), max_age)
+
+    def get_data(self, catalog: MappedSnapshot) -> list[dict[str, Any]]:
+        return [value for _, value in catalog.items(self.section)]
+
+
+class PlanCatalogView(CatalogView):
+    """Active plans with their feature values and active prices."""
+
+    section = PLANS
+    surrogate_key = "catalog-plans"
+
+    def get_data(self, catalog: MappedSnapshot) -> list[dict[str, Any]]:
+        plans = []
+        for _, plan in catalog.items(self.section):
+            if not plan["is_active"]:
+                continue
+            prices = [catalog.get(PLAN_PRICES, str(price_id)) for price_id in plan.pop("prices")]
+            plan["prices"] = [price for price in prices if price and price["is_active"]]
+            plans.append(plan)
+        return sorted(plans, key=lambda plan: plan["id"])
+
+
+class PriceCatalogView(CatalogView):
+    """Active plan prices with their tiers."""
+
+    section = PLAN_PRICES
+    surrogate_key = "catalog-prices"
+
+    def get_data(self, catalog: MappedSnapshot) -> list[dict[str, Any]]:
+        prices = [price for _, price in catalog.items(self.section) if price["is_active"]]
+        return sorted(prices, key=lambda price: price["id"])
+
+
+class FeatureCatalogView(CatalogView):
+    """Features that plans can include."""
+
+    section = FEATURES
+    surrogate_key = "catalog-features"
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self) -> None:
+        from apps.core import signals
+        from apps.core.metrics import install_query_counter
+        from apps.core.timing import install_db_timing
+
+        if settings.SERVER_TIMING:
+            connection_created.connect(install_db_timing)
+        if settings.METRICS_ENABLED:
+            connection_created.connect(install_query_counter)
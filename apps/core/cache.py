@@ -0,0 +1,239 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_registry: dict[str, "LocalCache"] = {}
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+class LocalCache:
+    """
+    Bounded LRU cache with per-entry TTL that lives in the worker process.
+
+    Every instance is registered under a namespace so that invalidations
+    broadcast by other gunicorn workers (see broadcast_invalidation) reach it.
+    Values are shared between threads and must be treated as read-only.
+    """
+
+    def __init__(self, namespace: str, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self.namespace = namespace
+        self.maxsize = maxsize or settings.LOCAL_CACHE_MAXSIZE
+        self.ttl = ttl if ttl is not None else settings.LOCAL_CACHE_TTL
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        _registry[namespace] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        _ensure_listener()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                value = _MISSING
+            else:
+                expires_at, value = entry  # type: ignore[misc]
+                if expires_at < time.monotonic():
+                    del self._data[key]
+                    value = _MISSING
+                else:
+                    self._data.move_to_end(key)
+        if value is _MISSING:
+            CACHE_REQUESTS.inc(cache=self.namespace, result="miss")
+            return default
+        CACHE_REQUESTS.inc(cache=self.namespace, result="hit")
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def broadcast_invalidation(namespace: str, key: Hashable | None = None) -> None:
+    """
+    Drops ``key`` (or the whole namespace when ``key`` is None) from the local
+    cache of this worker and publishes the invalidation to every other worker.
+    """
+    _apply_invalidation(namespace, key)
+    try:
+        from django_redis import get_redis_connection
+
+        message = json.dumps({"namespace": namespace, "key": key})
+        get_redis_connection("default").publish(_channel_name(), message)
+    except Exception as e:
+        logger.warning(f"Could not publish local cache invalidation for '{namespace}': {e}")
+
+
+def get_generations(*names: str) -> list[int]:
+    """
+    Returns the current value of each named generation counter. Counters are
+    used to version cache keys, so bumping one invalidates every key built
+    from it without scanning Redis.
+    """
+    keys = [_generation_key(name) for name in names]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        value = found.get(key)
+        if value is None:
+            value = _init_generation(key)
+        generations.append(int(value))
+    return generations
+
+
+def bump_generation(name: str) -> int:
+    key = _generation_key(name)
+    try:
+        return int(cache.incr(key))
+    except ValueError:
+        _init_generation(key)
+        return int(cache.incr(key))
+
+
+def model_generation(model: type[Model], tenant_id: int | None = None) -> str:
+    """
+    Name of the generation counter bumped whenever a row of ``model`` is
+    saved or deleted (see apps.core.signals), e.g. "tenant:42:departments"
+    for tenant-owned models and "plans" for shared ones.
+    """
+    table = model._meta.db_table
+    return f"tenant:{tenant_id}:{table}" if tenant_id is not None else table
+
+
+def get_user_ident(user: Any) -> str:
+    """Stable identity of an authenticated principal, for cache and throttle keys."""
+    if user.pk is not None:
+        return str(user.pk)
+    # API keys have no user row.
+    return f"key:{user.api_key_id}"
+
+
+@lru_cache(maxsize=None)
+def is_tenant_model(model: type[Model]) -> bool:
+    return any(field.name == "tenant" for field in model._meta.concrete_fields)
+
+
+def _init_generation(key: str) -> int:
+    # Seeded from the clock rather than 0, so a counter evicted from Redis
+    # cannot restart at a value that older cache keys were built with.
+    cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+    return int(cache.get(key))
+
+
+def _generation_key(name: str) -> str:
+    return f"generation:{name}"
+
+
+def _apply_invalidation(namespace: str, key: Hashable | None) -> None:
+    local_cache = _registry.get(namespace)
+    if local_cache is None:
+        return
+    if key is None:
+        local_cache.clear()
+    else:
+        local_cache.delete(key)
+
+
+def _clear_all() -> None:
+    for local_cache in _registry.values():
+        local_cache.clear()
+
+
+def _channel_name() -> str:
+    return f"{settings.CACHES['default'].get('KEY_PREFIX', '')}:local-cache:invalidate"
+
+
+def _ensure_listener() -> None:
+    global _listener_started
+    if _listener_started or not settings.LOCAL_CACHE_INVALIDATION_ENABLED:
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        _listener_started = True
+        thread = threading.Thread(target=_listen, name="local-cache-invalidation", daemon=True)
+        thread.start()
+
+
+def _listen() -> None:
+    """
+    Subscribes to the invalidation channel for the lifetime of the worker.
+    After a connection loss every local cache is cleared once the channel is
+    subscribed again, since invalidations may have been missed meanwhile.
+    """
+    client = _listener_client()
+    interval = settings.LOCAL_CACHE_HEALTH_CHECK_INTERVAL
+    backoff = 1.0
+    disconnected = False
+    while True:
+        pubsub = client.pubsub()
+        try:
+            pubsub.subscribe(_channel_name())
+            while True:
+                # Returns every interval at the latest, so the connection is health checked while idle.
+                message = pubsub.get_message(timeout=interval)
+                if message is None:
+                    continue
+                if message["type"] == "subscribe":
+                    if disconnected:
+                        _clear_all()
+                        disconnected = False
+                    backoff = 1.0
+                elif message["type"] == "message":
+                    payload = json.loads(message["data"])
+                    key = payload.get("key")
+                    _apply_invalidation(payload["namespace"], tuple(key) if isinstance(key, list) else key)
+        except Exception as e:
+            logger.warning(f"Local cache invalidation listener disconnected: {e}")
+        finally:
+            pubsub.close()
+        disconnected = True
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+def _listener_client() -> Any:
+    """
+    Redis client of the listener, on a connection of its own: the default
+    connections time out after SOCKET_TIMEOUT, which an idle subscription
+    would hit. Dead connections are detected by health checks instead.
+    """
+    import redis
+    from django_redis import get_redis_connection
+
+    pool = get_redis_connection("default").connection_pool
+    connection_kwargs = {
+        **pool.connection_kwargs,
+        "socket_timeout": None,
+        "socket_keepalive": True,
+        "health_check_interval": settings.LOCAL_CACHE_HEALTH_CHECK_INTERVAL,
+    }
+    connection_pool = redis.ConnectionPool(connection_class=pool.connection_class, **connection_kwargs)
+    return redis.Redis(connection_pool=connection_pool)
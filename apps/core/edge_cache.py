@@ -0,0 +1,51 @@
+import logging
+import urllib.request
+from typing import Iterable
+
+from django.conf import settings
+from django.http import HttpResponseBase
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+
+
+def public_cache(response: HttpResponseBase, surrogate_keys: Iterable[str], max_age: int) -> HttpResponseBase:
+    """
+    Marks a response that is the same for every client as cacheable by
+    shared caches (nginx, CDN) for ``max_age`` seconds. The representation
+    only varies by the negotiated format and encoding, and the surrogate
+    keys tag it for purge_surrogate_keys.
+    """
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=max_age,
+        s_maxage=max_age,
+        stale_while_revalidate=settings.EDGE_CACHE_STALE_WHILE_REVALIDATE,
+    )
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    response[SURROGATE_KEY_HEADER] = " ".join(surrogate_keys)
+    return response
+
+
+def purge_surrogate_keys(*keys: str) -> bool:
+    """
+    Asks the edge cache to drop every response tagged with one of ``keys``
+    by sending PURGE to EDGE_CACHE_PURGE_URL with a Surrogate-Key header
+    (Varnish xkey, Fastly or nginx with a purge module). Does nothing when
+    no purge URL is configured. Returns whether the purge was accepted.
+    """
+    if not settings.EDGE_CACHE_PURGE_URL or not keys:
+        return False
+
+    request = urllib.request.Request(
+        settings.EDGE_CACHE_PURGE_URL, method="PURGE", headers={SURROGATE_KEY_HEADER: " ".join(keys)}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings.EDGE_CACHE_PURGE_TIMEOUT) as response:  # nosec B310
+            return 200 <= response.status < 300
+    except OSError as e:
+        logger.warning(f"Purging surrogate keys {keys} failed: {e}")
+        return False
@@ -0,0 +1,342 @@
+import fcntl
+import glob
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Iterator, Sequence
+
+import orjson
+from django.conf import settings
+
+# Upper bounds of the request duration buckets, in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Label values of the series recorded once a metric has METRICS_MAX_SERIES series.
+OVERFLOW = "__overflow__"
+
+ARCHIVE_FILE = "archive.db"
+LOCK_FILE = ".lock"
+INITIAL_SIZE = 64 * 1024
+
+_HEADER = struct.Struct("I")
+_LENGTH = struct.Struct("I")
+_VALUE = struct.Struct("d")
+
+REGISTRY: dict[str, "Metric"] = {}
+
+
+class MmapValues:
+    """
+    Doubles keyed by strings in a memory-mapped file that only its process
+    writes, so updates are plain memory writes and other processes read the
+    file at any time. The file starts with the number of bytes used; each
+    entry is the key length, the key padded to 8 bytes and the value, so
+    values are aligned and written in one store. Entries are written before
+    the used size that makes them visible.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        capacity = os.fstat(self._file.fileno()).st_size
+        if capacity == 0:
+            capacity = INITIAL_SIZE
+            self._file.truncate(capacity)
+        self._capacity = capacity
+        self._mmap = mmap.mmap(self._file.fileno(), capacity)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or 8
+        self._positions = {key: position for key, _, position in _entries(self._mmap, self._used)}
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            (value,) = _VALUE.unpack_from(self._mmap, position)
+            _VALUE.pack_into(self._mmap, position, value + amount)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode()
+        padded = len(encoded) + (-(_LENGTH.size + len(encoded)) % 8)
+        entry = struct.pack(f"I{padded}sd", len(encoded), encoded, 0.0)
+        used = self._used
+        end = used + len(entry)
+        if end > self._capacity:
+            while end > self._capacity:
+                self._capacity *= 2
+            self._mmap.close()
+            self._file.truncate(self._capacity)
+            self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        self._mmap[used:end] = entry
+        self._used = end
+        _HEADER.pack_into(self._mmap, 0, end)
+        self._positions[key] = end - _VALUE.size
+        return end - _VALUE.size
+
+
+def read_values(path: str) -> Iterator[tuple[str, float]]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    if len(data) < _HEADER.size:
+        return
+    for key, value, _ in _entries(data, _HEADER.unpack_from(data, 0)[0]):
+        yield key, value
+
+
+def _entries(data: Any, used: int) -> Iterator[tuple[str, float, int]]:
+    position = 8
+    while position < used:
+        (length,) = _LENGTH.unpack_from(data, position)
+        start = position + _LENGTH.size
+        end = start + length
+        key = bytes(data[start:end]).decode()
+        position = end + (-(_LENGTH.size + length) % 8)
+        (value,) = _VALUE.unpack_from(data, position)
+        yield key, value, position
+        position += _VALUE.size
+
+
+class _ProcessValues:
+    """The values file of the current process, reopened after a fork."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: MmapValues | None = None
+        self._pid: int | None = None
+
+    def get(self) -> MmapValues:
+        values = self._values
+        if values is not None and self._pid == os.getpid():
+            return values
+        with self._lock:
+            if self._values is None or self._pid != os.getpid():
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                self._values = MmapValues(worker_path(settings.METRICS_DIR, os.getpid()))
+                self._pid = os.getpid()
+            return self._values
+
+
+_process_values = _ProcessValues()
+
+
+class Metric:
+    """
+    A metric whose values every process adds to its own file, merged by
+    collect(). Label names are fixed; a process records at most
+    METRICS_MAX_SERIES label sets per metric and counts the others under
+    OVERFLOW, so an unbounded label value cannot grow the files.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: set[tuple[str, ...]] = set()
+        self._keys: dict[tuple[str, tuple[str, ...]], str] = {}
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def _label_values(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        if values not in self._series:
+            with self._lock:
+                if values not in self._series and len(self._series) >= settings.METRICS_MAX_SERIES:
+                    values = (OVERFLOW,) * len(values)
+                self._series.add(values)
+        return values
+
+    def _add(self, sample: str, values: tuple[str, ...], amount: float) -> None:
+        key = self._keys.get((sample, values))
+        if key is None:
+            key = self._keys[sample, values] = orjson.dumps([sample, values]).decode()
+        _process_values.get().add(key, amount)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if settings.METRICS_ENABLED:
+            self._add(self.name, self._label_values(labels), amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.bounds = [*map(_format_value, self.buckets), "+Inf"]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        values = self._label_values(labels)
+        # Buckets are stored per bound and made cumulative by collect().
+        self._add(f"{self.name}_bucket", (*values, self.bounds[bisect_left(self.buckets, value)]), 1)
+        self._add(f"{self.name}_sum", values, value)
+        self._add(f"{self.name}_count", values, 1)
+
+
+def worker_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"worker_{pid}.db")
+
+
+@contextmanager
+def directory_lock(directory: str, exclusive: bool = False) -> Iterator[None]:
+    """Lock of the files of ``directory``: shared to read them, exclusive to merge them."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def mark_process_dead(directory: str, pid: int) -> None:
+    """
+    Merges the file of a process that exited into the archive file, so the
+    directory does not grow with every recycled worker. Runs in the gunicorn
+    master, the only process writing the archive.
+    """
+    path = worker_path(directory, pid)
+    if not os.path.exists(path):
+        return
+    with directory_lock(directory, exclusive=True):
+        archive = MmapValues(os.path.join(directory, ARCHIVE_FILE))
+        try:
+            for key, value in read_values(path):
+                archive.add(key, value)
+        finally:
+            archive.close()
+        os.remove(path)
+
+
+def clear_metrics(directory: str) -> None:
+    """Removes the files of a previous run, called when the server starts."""
+    with directory_lock(directory, exclusive=True):
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def collect(directory: str | None = None) -> str:
+    """Sums the values of every process and renders them in the Prometheus text format."""
+    directory = directory or settings.METRICS_DIR
+    merged: dict[str, float] = {}
+    with directory_lock(directory):
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            for key, value in read_values(path):
+                merged[key] = merged.get(key, 0.0) + value
+
+    samples: dict[str, dict[tuple[str, ...], float]] = {}
+    for key, value in merged.items():
+        sample, values = orjson.loads(key)
+        samples.setdefault(sample, {})[tuple(values)] = value
+
+    lines = []
+    for name in sorted(REGISTRY):
+        metric = REGISTRY[name]
+        lines.append(f"# HELP {name} {_escape(metric.documentation)}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            lines.extend(_histogram_lines(metric, samples))
+        else:
+            for values, value in sorted(samples.get(name, {}).items()):
+                lines.append(f"{name}{_labels(metric.labelnames, values)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: Histogram, samples: dict[str, dict[tuple[str, ...], float]]) -> list[str]:
+    buckets: dict[tuple[str, ...], dict[str, float]] = {}
+    for values, value in samples.get(f"{metric.name}_bucket", {}).items():
+        buckets.setdefault(values[:-1], {})[values[-1]] = value
+
+    lines = []
+    labelnames = (*metric.labelnames, "le")
+    for values, counts in sorted(buckets.items()):
+        cumulative = 0.0
+        for bound in metric.bounds:
+            cumulative += counts.get(bound, 0.0)
+            lines.append(f"{metric.name}_bucket{_labels(labelnames, (*values, bound))} {_format_value(cumulative)}")
+        for suffix in ("sum", "count"):
+            value = samples.get(f"{metric.name}_{suffix}", {}).get(values, 0.0)
+            lines.append(f"{metric.name}_{suffix}{_labels(metric.labelnames, values)} {_format_value(value)}")
+    return lines
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value, quote=True)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str, quote: bool = False) -> str:
+    value = value.replace("\\", r"\\").replace("\n", r"\n")
+    return value.replace('"', r"\"") if quote else value
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_request_queries: ContextVar[list[int] | None] = ContextVar("request_queries", default=None)
+
+
+def start_query_count() -> Token[list[int] | None]:
+    return _request_queries.set([0])
+
+
+def reset_query_count(token: Token[list[int] | None]) -> int:
+    """Returns the number of queries of the request and stops counting them."""
+    count = _request_queries.get()
+    _request_queries.reset(token)
+    return count[0] if count is not None else 0
+
+
+def db_query_counter(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """Database execute wrapper counting the queries of the current request, see install_query_counter."""
+    count = _request_queries.get()
+    if count is not None:
+        count[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """connection_created receiver adding db_query_counter to the new connection."""
+    if db_query_counter not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_query_counter)
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests.", ("route", "method", "status", "tier"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duration of HTTP requests in seconds.", ("route", "method", "tier")
+)
+DB_QUERIES = Counter("db_queries_total", "Database queries run by HTTP requests.", ("route", "method"))
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+THROTTLE_REJECTIONS = Counter("throttle_rejections_total", "Requests rejected by throttling.", ("scope",))
+LOG_SAMPLED_REQUESTS = Counter(
+    "log_sampled_requests_total", "Requests whose logs below WARNING were kept or dropped.", ("decision",)
+)
+LOG_DROPPED_RECORDS = Counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+
+def count_dropped_log_record(record: Any) -> None:
+    """on_drop callback of QueueListenerHandler, see LOG_PIPELINE."""
+    LOG_DROPPED_RECORDS.inc()
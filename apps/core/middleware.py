@@ -1,81 +1,284 @@
 import logging
 import time
 import uuid
+from contextvars import Token
+from typing import Any, Awaitable, Callable
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import HttpRequest, HttpResponse
-from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject, empty
+
+from apps.business.catalog import PLANS, get_catalog
+from apps.business.entitlements import get_entitlements
+from apps.core.metrics import (
+    DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    LOG_SAMPLED_REQUESTS,
+    reset_query_count,
+    start_query_count,
+)
+from apps.core.timing import get_timings, reset_timings, start_timings
+from apps.tenancies.context import get_current_tenant
+from apps.tenancies.models import Tenant
+from config.loggers.context import reset_request_context, set_request_context, update_request_context
+from config.loggers.sampling import AccessLogSampler, reset_request_level, set_request_level
 
 logger = logging.getLogger("django.request")
 
 
-class LoggingMiddleware(MiddlewareMixin):
-    def process_request(self, request: HttpRequest) -> None:
-        request_id = request.META.get("HTTP_X_REQUEST_ID", uuid.uuid4().hex)
-        request.request_id = request_id  # type: ignore[attr-defined]
-        request.start_time = time.time()  # type: ignore[attr-defined]
+def get_log_user(request: HttpRequest) -> str:
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    # API key users have no email; they log as the key's name.
+    return getattr(user, "email", None) or user.get_username()  # type: ignore[no-any-return]
+
+
+def _loaded_log_user(request: HttpRequest) -> str | None:
+    """The user of the request if it is already loaded, without querying from an event loop."""
+    user = getattr(request, "user", None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:  # type: ignore[attr-defined]
         return None
+    return get_log_user(request)
+
+
+class LoggingMiddleware:
+    """
+    Logs one access line per request. The request context (user, ip,
+    request_id, method, path) is built once and set in a contextvar, from
+    which every record logged during the request gets it, see
+    config.loggers.context.
+
+    Once the view and the tenant are known, AccessLogSampler decides whether
+    the records of the request below WARNING are logged. Errors and requests
+    slower than LOG_SLOW_REQUEST_MS still write their access line.
+
+    With SERVER_TIMING, the spans of the request (see apps.core.timing) are
+    added to the access line as ``timings`` and sent in a Server-Timing
+    header: tenant (TenantMiddleware), auth (authentication classes), perm
+    (tenant permissions), db (every query), ser (serializers built on
+    DynamicFieldsMixin) and render (ORJSONRenderer).
+
+    Runs natively in both sync and async chains: contextvars are set and
+    reset within one call, as Django runs the process_* hooks of an async
+    chain each in a context of their own.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]) -> None:
+        self.get_response = get_response
+        self.sampler = AccessLogSampler(
+            settings.LOG_SAMPLE_RATE, settings.LOG_SAMPLE_ROUTES, settings.LOG_SAMPLE_TENANTS, settings.LOG_ROUTE_LEVELS
+        )
+        self.slow_request_ms = settings.LOG_SLOW_REQUEST_MS
+        self.server_timing = settings.SERVER_TIMING
+        self.server_timing_header = settings.SERVER_TIMING_HEADER
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
 
-    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
-        duration = time.time() - getattr(request, "start_time", time.time())
-        ms_duration = duration * 1000
+        tokens = self._start(request)
+        try:
+            return self._finish(request, self.get_response(request))  # type: ignore[arg-type]
+        finally:
+            self._reset(tokens)
 
-        user = "anonymous"
-        if hasattr(request, "user") and request.user.is_authenticated:
-            user = request.user.email
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        tokens = self._start(request)
+        try:
+            return self._finish(request, await self.get_response(request))  # type: ignore[misc]
+        finally:
+            self._reset(tokens)
 
-        log_context = {
-            "user": user,
+    def process_view(
+        self, request: HttpRequest, view_func: Callable[..., Any], view_args: Any, view_kwargs: Any
+    ) -> None:
+        # Runs in a worker thread in an async chain, so loading the user is safe here.
+        # Views that authenticate nobody keep the session untouched, so their public
+        # responses do not vary on Cookie.
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None or view_class.authentication_classes:
+            update_request_context(user=get_log_user(request))
+        tenant = get_current_tenant()
+        level = self.sampler.get_level(
+            request.request_id, request.path, tenant.slug if tenant else None  # type: ignore[attr-defined]
+        )
+        request.log_level = level  # type: ignore[attr-defined]
+        # Set without a token: the value is copied back to the context of the call, which resets it.
+        set_request_level(level)
+        return None
+
+    def process_exception(self, request: HttpRequest, exception: Exception) -> None:
+        if logger.isEnabledFor(logging.ERROR):
+            update_request_context(user=get_log_user(request))
+            ms_duration = _duration(request)
+            logger.error(
+                "UNCATCHED EXCEPTION: %s - %s",
+                type(exception).__name__,
+                exception,
+                exc_info=True,
+                extra={"status_code": 500, "duration": ms_duration},
+            )
+        return None
+
+    def _start(self, request: HttpRequest) -> list[tuple[Callable[[Any], None], Token[Any]]]:
+        request_id = request.META.get("HTTP_X_REQUEST_ID") or uuid.uuid4().hex
+        request.request_id = request_id  # type: ignore[attr-defined]
+        request.start_time = time.perf_counter_ns()  # type: ignore[attr-defined]
+        tokens: list[tuple[Callable[[Any], None], Token[Any]]] = []
+        if self.server_timing:
+            tokens.append((reset_timings, start_timings()))
+        context = {
+            "user": _loaded_log_user(request) or "anonymous",
             "ip": request.META.get("REMOTE_ADDR", ""),
-            "request_id": getattr(request, "request_id", "none"),
+            "request_id": request_id,
             "method": request.method,
             "path": request.path,
-            "status_code": response.status_code,
-            "duration": ms_duration,
         }
+        tokens.append((reset_request_context, set_request_context(context)))
+        tokens.append((reset_request_level, set_request_level(logging.NOTSET)))
+        return tokens
 
-        if settings.DEBUG:
+    def _reset(self, tokens: list[tuple[Callable[[Any], None], Token[Any]]]) -> None:
+        for reset, token in reversed(tokens):
+            reset(token)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if settings.DEBUG or response.status_code >= 400:
             response["X-Request-ID"] = getattr(request, "request_id", "none")
-        else:
-            if response.status_code >= 400:
-                response["X-Request-ID"] = getattr(request, "request_id", "none")
+
+        ms_duration = _duration(request)
+        timings = get_timings() if self.server_timing else None
+        if timings is not None and self.server_timing_header:
+            response["Server-Timing"] = timings.header(ms_duration)
 
         if response.status_code >= 500:
-            logger.error(
-                f"{request.method} {request.path} → {response.status_code} ({ms_duration:.2f}ms)",
-                extra=log_context,
-            )
+            level = logging.ERROR
         elif response.status_code >= 400:
-            logger.warning(
-                f"{request.method} {request.path} → {response.status_code} ({ms_duration:.2f}ms)",
-                extra=log_context,
-            )
+            level = logging.WARNING
         else:
-            logger.info(
-                f"{request.method} {request.path} → {response.status_code} ({ms_duration:.2f}ms)",
-                extra=log_context,
-            )
+            level = logging.INFO
 
+        request_level = getattr(request, "log_level", logging.NOTSET)
+        if level < request_level and ms_duration >= self.slow_request_ms:
+            # Slow requests write their access line even when sampled out.
+            set_request_level(logging.NOTSET)
+            request_level = logging.NOTSET
+        LOG_SAMPLED_REQUESTS.inc(decision="kept" if level >= request_level else "dropped")
+
+        if logger.isEnabledFor(level) and level >= request_level:
+            # The user is only known once the view has authenticated the request.
+            user = _loaded_log_user(request)
+            if user is not None:
+                update_request_context(user=user)
+            extra: dict[str, Any] = {"status_code": response.status_code, "duration": ms_duration}
+            if timings is not None:
+                extra["timings"] = timings.milliseconds()
+                extra["db_queries"] = timings.counts.get("db", 0)
+            logger.log(
+                level,
+                "%s %s → %s (%.2fms)",
+                request.method,
+                request.path,
+                response.status_code,
+                ms_duration,
+                extra=extra,
+            )
         return response
 
-    def process_exception(self, request: HttpRequest, exception: Exception) -> None:
-        duration = time.time() - getattr(request, "start_time", time.time())
-        ms_duration = duration * 1000
 
-        log_context = {
-            "user": (request.user.email if hasattr(request, "user") and request.user.is_authenticated else "anonymous"),
-            "ip": request.META.get("REMOTE_ADDR", ""),
-            "request_id": getattr(request, "request_id", "none"),
-            "method": request.method,
-            "path": request.path,
-            "status_code": 500,
-            "duration": ms_duration,
-        }
+class MetricsMiddleware:
+    """
+    Counts requests and observes their duration and database queries, see
+    apps.core.metrics. Labels are kept to bounded sets: the URL pattern
+    instead of the path, known methods, and the plan of the tenant as its
+    tier. Goes first in MIDDLEWARE so it times the whole chain.
 
-        logger.error(
-            f"UNCATCHED EXCEPTION: {type(exception).__name__} - {str(exception)}",
-            exc_info=True,
-            extra=log_context,
-        )
+    Runs natively in both sync and async chains, so the query counter is
+    set and reset within one call. The tier is looked up in process_view and
+    process_template_response, which an async chain runs in worker threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+    methods = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
 
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]) -> None:
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter_ns()
+        token = start_query_count()
+        try:
+            response = self.get_response(request)
+        finally:
+            queries = reset_query_count(token)
+        return self._observe(request, response, start, queries)  # type: ignore[arg-type]
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter_ns()
+        token = start_query_count()
+        try:
+            response = await self.get_response(request)  # type: ignore[misc]
+        finally:
+            queries = reset_query_count(token)
+        return self._observe(request, response, start, queries)
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable[..., Any], view_args: Any, view_kwargs: Any
+    ) -> None:
+        # The tenant is only active until TenantMiddleware returns.
+        tenant = get_current_tenant()
+        request.metrics_tenant = tenant  # type: ignore[attr-defined]
+        request.metrics_tier = tenant_tier(tenant)  # type: ignore[attr-defined]
         return None
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        # DRF responses: the authentication classes may have activated the tenant of the token.
+        tenant = get_current_tenant()
+        if tenant != getattr(request, "metrics_tenant", None):
+            request.metrics_tenant = tenant  # type: ignore[attr-defined]
+            request.metrics_tier = tenant_tier(tenant)  # type: ignore[attr-defined]
+        return response
+
+    def _observe(self, request: HttpRequest, response: HttpResponse, start: int, queries: int) -> HttpResponse:
+        match = request.resolver_match
+        route = match.route if match is not None else "unmatched"
+        method = request.method if request.method in self.methods else "other"
+        tier = getattr(request, "metrics_tier", "none")
+        HTTP_REQUESTS.inc(route=route, method=method, status=response.status_code, tier=tier)
+        HTTP_REQUEST_DURATION.observe((time.perf_counter_ns() - start) / 1e9, route=route, method=method, tier=tier)
+        if queries:
+            DB_QUERIES.inc(queries, route=route, method=method)
+        return response
+
+
+def tenant_tier(tenant: Tenant | None) -> str:
+    """The name of the tenant's current plan, a label value from the plan catalog."""
+    if tenant is None:
+        return "none"
+    plan_id = get_entitlements(tenant).plan_id
+    if plan_id is None:
+        return "unsubscribed"
+    return get_catalog().get(PLANS, str(plan_id), {}).get("name") or "unknown"
+
+
+def _duration(request: HttpRequest) -> float:
+    """Milliseconds since the request reached LoggingMiddleware."""
+    start = getattr(request, "start_time", None)
+    return (time.perf_counter_ns() - start) / 1_000_000 if start is not None else 0.0
@@ -5,6 +5,10 @@ from typing import Any, Callable
 from django.http import HttpRequest
 from rest_framework.response import Response
 
+from config.loggers.context import update_request_context
+
+from .middleware import get_log_user
+
 
 class LoggingMixin:
     """
@@ -27,59 +31,35 @@ class LoggingMixin:
             # We'll use the original request in that case.
             initialized_request = request
 
-        self._setup_logging_context(initialized_request)
-        self.logger.info(
-            f"Starting request: {initialized_request.method} {initialized_request.path}",
-            extra=self._get_logging_extra(initialized_request),
-        )
+        self.logger.info("Starting request: %s %s", initialized_request.method, initialized_request.path)
         return initialized_request  # type: ignore[no-any-return]
 
+    def perform_authentication(self, request: HttpRequest) -> None:
+        super().perform_authentication(request)  # type: ignore[misc]
+        update_request_context(user=get_log_user(request))
+
     def finalize_response(self, request: HttpRequest, response: Response, *args: Any, **kwargs: Any) -> Response:
         # The super() call is valid because this mixin is intended to be used with DRF Views.
         finalized_response = super().finalize_response(request, response, *args, **kwargs)  # type: ignore[misc]
-        extra = self._get_logging_extra(request)
-        extra["status_code"] = finalized_response.status_code
-
-        if finalized_response.status_code >= 500:
-            self.logger.error(f"Request ended with error: {finalized_response.status_code}", extra=extra)
-        elif finalized_response.status_code >= 400:
-            self.logger.warning(
-                f"Request ended with warning: {finalized_response.status_code}",
-                extra=extra,
-            )
+        status_code = finalized_response.status_code
+        extra = {"status_code": status_code}
+
+        if status_code >= 500:
+            self.logger.error("Request ended with error: %s", status_code, extra=extra)
+        elif status_code >= 400:
+            self.logger.warning("Request ended with warning: %s", status_code, extra=extra)
         else:
-            self.logger.info(
-                f"Request completed successfully: {finalized_response.status_code}",
-                extra=extra,
-            )
+            self.logger.info("Request completed successfully: %s", status_code, extra=extra)
         return finalized_response  # type: ignore[no-any-return]
 
-    def _setup_logging_context(self, request: HttpRequest) -> None:
-        """Sets up logging context for the request"""
-        request.logging_context = {  # type: ignore[attr-defined]
-            "user": (request.user.email if request.user.is_authenticated else "anonymous"),
-            "ip": request.META.get("REMOTE_ADDR"),
-            "request_id": getattr(request, "request_id", "none"),
-            "method": request.method,
-            "path": request.path,
-        }
-
-    def _get_logging_extra(self, request: HttpRequest) -> dict[str, Any]:
-        """Gets the extra dictionary for logging"""
-        return getattr(request, "logging_context", {})  # type: ignore[attr-defined]
-
     def log_action(self, message: str, level: str = "info", **additional_context: Any) -> None:
         """
         Method to log custom actions with additional context
         Usage in views: self.log_action("Message", level='warning', extra_field=value)
+        The request context (user, ip, request_id, method, path) is added by the record factory.
         """
-        request = self.request
-        extra = self._get_logging_extra(request).copy()
-        extra.update(additional_context)
-
-        log_level = level.lower()
-        log_method = getattr(self.logger, log_level, self.logger.info)
-        log_method(message, extra=extra)
+        log_method = getattr(self.logger, level.lower(), self.logger.info)
+        log_method(message, extra=additional_context)
 
     @classmethod
     def log_action_decorator(cls, message: str, level: str = "info") -> Callable[..., Any]:
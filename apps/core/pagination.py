@@ -0,0 +1,218 @@
+import json
+from typing import Any, Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.models import Field, Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+# Kinds of the optional count of a page.
+EXACT = "exact"
+AT_LEAST = "atLeast"
+ESTIMATE = "estimate"
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination. Rows are ordered by ``keyset_ordering`` of the
+    view, by default newest first with the primary key as tie-breaker, and a
+    page is the next ``limit`` rows after the position in the cursor:
+
+        WHERE created_at <= %s AND (created_at < %s OR (created_at = %s AND id < %s))
+        ORDER BY created_at DESC, id DESC LIMIT 21
+
+    so with an index on (tenant, -created_at) a deep page costs the same as
+    the first one. Ordering fields must be non-null columns of the model.
+
+    The cursor is signed and bound to the model and the ordering. Counts
+    are only computed on request: ``?count=exact`` counts up to
+    PAGINATION_COUNT_CAP rows and ``?count=estimate`` asks the planner.
+    """
+
+    ordering: Sequence[str] = ("-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = settings.REST_FRAMEWORK["MAX_PAGE_SIZE"]
+    count_cap = settings.REST_FRAMEWORK["PAGINATION_COUNT_CAP"]
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> list[Model]:
+        self.request = request
+        self.limit = self.get_page_size(request)
+        self.fields = self.get_fields(queryset.model, view)
+        self.salt = f"{__name__}:{queryset.model._meta.label}:{','.join(self.get_ordering(queryset.model, view))}"
+
+        self.count, self.count_kind = self.get_count(queryset, request)
+
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred:
+            # The cursor reads the ordering columns, keep them in a queryset narrowed with only().
+            queryset = queryset.only(*loaded, *(field.name for field, _ in self.fields))
+
+        position, reverse = self.decode_cursor(request)
+        ordering = [f"{'-' if descending != reverse else ''}{field.attname}" for field, descending in self.fields]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, reverse))
+
+        limit = self.limit
+        rows = list(queryset[: limit + 1])
+        has_more = len(rows) > limit
+        del rows[limit:]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data: Any) -> Response:
+        payload: dict[str, Any] = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["countKind"] = self.count_kind
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "countKind": {"type": "string", "enum": [EXACT, AT_LEAST, ESTIMATE]},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include a count of the results, exact (capped) or estimated.",
+                "schema": {"type": "string", "enum": [EXACT, ESTIMATE]},
+            },
+        ]
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size  # type: ignore[no-any-return]
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, model: type[Model], view: Any) -> Sequence[str]:
+        ordering = getattr(view, "keyset_ordering", None)
+        if ordering:
+            return ordering  # type: ignore[no-any-return]
+        # The default ordering falls back to the primary key on models without created_at.
+        names = {field.name for field in model._meta.concrete_fields}
+        return [name for name in self.ordering if name.lstrip("-") in names] or ["-pk"]
+
+    def get_fields(self, model: type[Model], view: Any) -> list[tuple[Field, bool]]:
+        fields = []
+        for name in self.get_ordering(model, view):
+            field_name = name.lstrip("-")
+            field = model._meta.pk if field_name == "pk" else model._meta.get_field(field_name)
+            fields.append((field, name.startswith("-")))
+        if not any(field.primary_key for field, _ in fields):
+            fields.append((model._meta.pk, fields[-1][1]))
+        return fields  # type: ignore[return-value]
+
+    def seek(self, position: list[Any], reverse: bool) -> Q:
+        """
+        Rows after ``position`` in the (possibly reversed) ordering. The
+        leading range on the first field lets the database seek the index.
+        """
+        condition = Q()
+        for index, (field, descending) in enumerate(self.fields):
+            lookup = "lt" if descending != reverse else "gt"
+            equal = {other.attname: position[i] for i, (other, _) in enumerate(self.fields[:index])}
+            condition |= Q(**equal, **{f"{field.attname}__{lookup}": position[index]})
+        first, descending = self.fields[0]
+        lookup = "lte" if descending != reverse else "gte"
+        return Q(**{f"{first.attname}__{lookup}": position[0]}) & condition
+
+    def get_count(self, queryset: QuerySet, request: Request) -> tuple[int | None, str | None]:
+        kind = request.query_params.get(self.count_query_param)
+        if kind == ESTIMATE and connections[queryset.db].vendor == "postgresql":
+            return _estimate_count(queryset), ESTIMATE
+        if kind in (EXACT, ESTIMATE):
+            cap = self.count_cap
+            count = queryset.order_by()[: cap + 1].count()
+            if count > cap:
+                return cap, AT_LEAST
+            return count, EXACT
+        return None, None
+
+    def decode_cursor(self, request: Request) -> tuple[list[Any] | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = signing.loads(encoded, salt=self.salt)
+            position = [field.to_python(value) for (field, _), value in zip(self.fields, cursor["p"], strict=True)]
+        except (signing.BadSignature, KeyError, TypeError, ValueError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return position, bool(cursor.get("r"))
+
+    def encode_cursor(self, row: Model, reverse: bool) -> str:
+        position = [field.value_to_string(row) for field, _ in self.fields]
+        cursor = signing.dumps({"p": position, "r": int(reverse)}, salt=self.salt, compress=True)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+def _estimate_count(queryset: QuerySet) -> int:
+    """
+    Row estimate of the planner: pg_class.reltuples for an unfiltered
+    table, the estimate of the query plan otherwise.
+    """
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table is first analyzed.
+        if row is not None and row[0] >= 0:
+            return int(row[0])
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
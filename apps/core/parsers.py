@@ -0,0 +1,29 @@
+import codecs
+from typing import IO, Any, Mapping
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser on top of orjson. Bodies in another encoding than UTF-8
+    are decoded first; NaN and Infinity are rejected.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(
+        self, stream: IO[bytes], media_type: str | None = None, parser_context: Mapping[str, Any] | None = None
+    ) -> Any:
+        encoding = (parser_context or {}).get("encoding") or "utf-8"
+        try:
+            content: bytes | str = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, LookupError) as e:
+            raise ParseError(f"JSON parse error - {e}")
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Prefetch, QuerySet
+from rest_framework import serializers
+
+
+@dataclass
+class QueryPlan:
+    """
+    Columns (``only`` lookups, or None when every column is needed) and
+    relations a serializer reads from instances of a model.
+    """
+
+    only: set[str] | None = field(default_factory=set)
+    select_related: set[str] = field(default_factory=set)
+    prefetch_related: dict[str, QuerySet | None] = field(default_factory=dict)
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(
+                *(Prefetch(lookup, queryset=related) for lookup, related in self.prefetch_related.items())
+            )
+        if self.only is not None:
+            # A joined relation listed by itself is loaded whole, which columns
+            # listed below it would restrict again.
+            whole = {lookup for lookup in self.only if lookup in self.select_related}
+            only = [
+                lookup
+                for lookup in sorted(self.only)
+                if not any(lookup.startswith(f"{relation}__") for relation in whole)
+            ]
+            queryset = queryset.only(*only)
+        return queryset
+
+
+def plan_queryset(queryset: QuerySet, serializer: serializers.BaseSerializer) -> QuerySet:
+    """
+    Narrows ``queryset`` to what ``serializer`` renders: forward relations
+    it reads are joined with select_related, reverse and many-to-many ones
+    are prefetched (with their own planned queryset for nested serializers),
+    and only the columns it reads are loaded. Fields whose source is not a
+    model field (methods, properties, ``source="*"``) keep every column of
+    their model.
+    """
+    return plan_serializer(queryset.model, serializer).apply(queryset)
+
+
+def plan_serializer(model: type[Model], serializer: serializers.BaseSerializer) -> QueryPlan:
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    plan = QueryPlan(only={model._meta.pk.name})
+
+    for serializer_field in serializer.fields.values():  # type: ignore[attr-defined]
+        if serializer_field.write_only:
+            continue
+        if serializer_field.source == "*":
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                _merge(plan, plan_serializer(model, serializer_field), "")
+            else:
+                plan.only = None
+            continue
+        _plan_source(plan, model, serializer_field, serializer_field.source.split("."))
+    return plan
+
+
+def _plan_source(plan: QueryPlan, model: type[Model], serializer_field: Any, attrs: list[str]) -> None:
+    prefix = ""
+    for position, attr in enumerate(attrs):
+        last = position == len(attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # A property or method: the instance must be complete.
+            _load_all(plan, prefix)
+            return
+        lookup = f"{prefix}{attr}"
+
+        if not model_field.is_relation:
+            if model_field.concrete:
+                _add_only(plan, lookup)
+            else:
+                _load_all(plan, prefix)
+            return
+
+        related_model = model_field.related_model
+        if related_model is None:
+            # A generic foreign key.
+            _load_all(plan, prefix)
+            return
+
+        if model_field.many_to_many or model_field.one_to_many:
+            if last and isinstance(serializer_field, serializers.BaseSerializer):
+                child = plan_serializer(related_model, serializer_field)
+                if child.only is not None and model_field.one_to_many:
+                    child.only.add(model_field.field.name)  # type: ignore[union-attr]
+                plan.prefetch_related[lookup] = child.apply(related_model._default_manager.all())
+            else:
+                plan.prefetch_related.setdefault(lookup, None)
+            return
+
+        # Forward foreign keys and one-to-one relations.
+        if last and isinstance(serializer_field, serializers.PrimaryKeyRelatedField):
+            _add_only(plan, lookup)
+            return
+        plan.select_related.add(lookup)
+        if last:
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                _merge(plan, plan_serializer(related_model, serializer_field), f"{lookup}__")
+            else:
+                _add_only(plan, lookup)
+            return
+        model = related_model
+        prefix = f"{lookup}__"
+
+
+def _merge(plan: QueryPlan, child: QueryPlan, prefix: str) -> None:
+    if not prefix:
+        if child.only is None:
+            plan.only = None
+        elif plan.only is not None:
+            plan.only |= child.only
+    elif child.only is None:
+        _add_only(plan, prefix[:-2])
+    else:
+        for lookup in child.only:
+            _add_only(plan, f"{prefix}{lookup}")
+    plan.select_related |= {f"{prefix}{lookup}" for lookup in child.select_related}
+    for lookup, related in child.prefetch_related.items():
+        plan.prefetch_related[f"{prefix}{lookup}"] = related
+
+
+def _add_only(plan: QueryPlan, lookup: str) -> None:
+    if plan.only is not None:
+        plan.only.add(lookup)
+
+
+def _load_all(plan: QueryPlan, prefix: str) -> None:
+    """Loads every column of the model at ``prefix`` (the root model when empty)."""
+    if prefix:
+        _add_only(plan, prefix[:-2])
+    else:
+        plan.only = None
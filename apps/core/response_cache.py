@@ -0,0 +1,230 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Iterable, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.tenancies.context import get_current_tenant
+
+from .cache import get_generations, get_user_ident, is_tenant_model, model_generation
+from .metrics import CACHE_REQUESTS
+
+# Response headers kept with a cached body.
+CACHED_HEADERS = ("Content-Language", "Vary", "Cache-Control", "ETag", "Last-Modified")
+
+Tag = type[Model] | str
+ViewMethod = Callable[..., HttpResponse]
+
+
+def cache_response(
+    tags: Sequence[Tag] = (),
+    timeout: int | None = None,
+    per_user: bool = True,
+    version: str = "1",
+) -> Callable[[ViewMethod], ViewMethod]:
+    """
+    Caches the rendered body of a successful GET handler of a DRF view.
+
+    The cache key is made of the view, the full path, the API version, the
+    negotiated format, the current tenant and either the user (``per_user``)
+    or the tenant's permission epoch, so responses never leak between
+    tenants or identities. It is versioned by the generation of every tag:
+    a model class stands for its rows in the current tenant (or all rows of
+    a shared model), and a string is a generation name that may contain
+    "{tenant_id}". Saving or deleting a row of a tagged model therefore
+    invalidates the response, see apps.core.signals.
+
+    The handler runs after authentication, permissions and throttling as
+    usual; a hit returns the stored bytes without touching the queryset,
+    the serializer or the renderer.
+
+        @cache_response(tags=[Department])
+        def list(self, request, *args, **kwargs): ...
+    """
+
+    def decorator(view_method: ViewMethod) -> ViewMethod:
+        @wraps(view_method)
+        def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view_method(view, request, *args, **kwargs)
+
+            key = _cache_key(view, request, tags, per_user, version)
+            cached = cache.get(key)
+            CACHE_REQUESTS.inc(cache="response", result="miss" if cached is None else "hit")
+            if cached is not None:
+                status, content, headers = cached
+                response = HttpResponse(content, status=status)
+                for header, value in headers:
+                    response[header] = value
+                response["X-Response-Cache"] = "hit"
+                return response
+
+            response = view_method(view, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                response.add_post_render_callback(lambda rendered: _store(key, rendered, timeout))
+                response["X-Response-Cache"] = "miss"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class CachedResponseMixin:
+    """
+    Caches list and retrieve responses of a viewset, see cache_response.
+
+        class DepartmentViewSet(CachedResponseMixin, TenantQuerysetMixin, ModelViewSet):
+            cache_tags = [Department]
+    """
+
+    cache_tags: Sequence[Tag] = ()
+    cache_timeout: int | None = None
+    cache_per_user: bool = True
+    cache_version: str = "1"
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return self._cached(super().list, request, *args, **kwargs)  # type: ignore[misc]
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return self._cached(super().retrieve, request, *args, **kwargs)  # type: ignore[misc]
+
+    def _cached(
+        self, handler: Callable[..., HttpResponse], request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        decorator = cache_response(self.cache_tags, self.cache_timeout, self.cache_per_user, self.cache_version)
+        return decorator(lambda view, *a, **kw: handler(*a, **kw))(self, request, *args, **kwargs)
+
+
+def condition_on_tags(
+    tags: Sequence[Tag] = (),
+    per_user: bool = True,
+    version: str = "1",
+) -> Callable[[ViewMethod], ViewMethod]:
+    """
+    Conditional GET for a DRF view handler. The ETag is derived from the
+    same inputs as the cache_response key, including the generation of
+    every tag, so it changes whenever a tagged model changes. A request whose
+    If-None-Match carries the current ETag gets 304 Not Modified before the
+    handler touches the queryset or the serializer.
+
+    Combine with cache_response by applying this decorator outermost, so
+    cached bodies carry their ETag.
+    """
+
+    def decorator(view_method: ViewMethod) -> ViewMethod:
+        @wraps(view_method)
+        def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view_method(view, request, *args, **kwargs)
+
+            etag = make_etag(view, request, tags, per_user, version)
+            if etag_matches(etag, request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code == 200 and not response.has_header("ETag"):
+                response["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / If-None-Match handling to list and retrieve of a viewset,
+    see condition_on_tags. Shares ``cache_tags`` with CachedResponseMixin
+    and must come before it in the bases.
+    """
+
+    cache_tags: Sequence[Tag] = ()
+    cache_per_user: bool = True
+    cache_version: str = "1"
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return self._conditional(super().list, request, *args, **kwargs)  # type: ignore[misc]
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return self._conditional(super().retrieve, request, *args, **kwargs)  # type: ignore[misc]
+
+    def _conditional(
+        self, handler: Callable[..., HttpResponse], request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        decorator = condition_on_tags(self.cache_tags, self.cache_per_user, self.cache_version)
+        return decorator(lambda view, *a, **kw: handler(*a, **kw))(self, request, *args, **kwargs)
+
+
+def make_etag(view: Any, request: Request, tags: Sequence[Tag], per_user: bool, version: str) -> str:
+    key = _cache_key(view, request, tags, per_user, version)
+    return f"W/{quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])}"
+
+
+def tag_generations(tags: Iterable[Tag], tenant_id: int | None) -> list[str]:
+    """
+    Resolves tags to generation counter names for the given tenant. Without
+    a tenant, tenant-owned models resolve to their model-wide generation,
+    which every write to them bumps (see apps.core.signals).
+    """
+    names = []
+    for tag in tags:
+        if isinstance(tag, str):
+            names.append(tag.format(tenant_id=tenant_id))
+        elif is_tenant_model(tag):
+            names.append(model_generation(tag, tenant_id))
+        else:
+            names.append(model_generation(tag))
+    return names
+
+
+def _cache_key(view: Any, request: Request, tags: Sequence[Tag], per_user: bool, version: str) -> str:
+    tenant = get_current_tenant()
+    tenant_id = tenant.pk if tenant is not None else None
+
+    if not request.user or not request.user.is_authenticated:
+        identity = "anon"
+    elif per_user:
+        identity = f"user:{get_user_ident(request.user)}"
+    elif tenant_id is not None:
+        from apps.authentication.access import get_permission_epoch
+
+        identity = f"epoch:{get_permission_epoch(tenant_id)}"
+    else:
+        identity = "authenticated"
+
+    names = tag_generations(tags, tenant_id)
+    generations = ".".join(map(str, get_generations(*names))) if names else "0"
+    renderer = getattr(request, "accepted_renderer", None)
+    path = hashlib.sha256(request.get_full_path().encode()).hexdigest()
+    return (
+        f"response:{settings.RESPONSE_CACHE_VERSION}.{version}:{type(view).__module__}.{type(view).__qualname__}:"
+        f"{request.version}:{getattr(renderer, 'format', '')}:{tenant_id}:{identity}:{generations}:{path}"
+    )
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in parse_etags(if_none_match)}
+
+
+def _store(key: str, response: Response, timeout: int | None) -> None:
+    headers = [(header, response[header]) for header in CACHED_HEADERS if response.has_header(header)]
+    headers.append(("Content-Type", response["Content-Type"]))
+    cache.set(
+        key,
+        (response.status_code, response.content, headers),
+        timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,91 @@
+from collections import defaultdict
+from typing import Any, Iterable, Mapping
+
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from .timing import span
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets and expandable relations for a ModelSerializer:
+
+        ?fields=id,name,plan.name     only these fields, nested ones dotted
+        ?expand=plan,plan.prices      render these relations with a serializer
+
+    ``expandable_fields`` maps a field name to the serializer (or its dotted
+    path) and keyword arguments used when it is expanded; otherwise the
+    field declared on the serializer, typically the primary key, is used.
+    Expanded relations are included even if ``fields`` does not list them.
+
+    The root serializer reads the query parameters of the request in its
+    context; ``fields`` and ``expand`` can also be passed explicitly. See
+    apps.core.planner for the matching queryset.
+    """
+
+    expandable_fields: Mapping[str, tuple[type[serializers.BaseSerializer] | str, dict[str, Any]]] = {}
+
+    def __init__(
+        self, *args: Any, fields: Iterable[str] | None = None, expand: Iterable[str] | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")  # type: ignore[attr-defined]
+        if fields is None and expand is None and request is not None:
+            fields = _split(request.query_params.get(FIELDS_PARAM))
+            expand = _split(request.query_params.get(EXPAND_PARAM))
+        if fields or expand:
+            self.narrow(fields or (), expand or ())
+
+    def to_representation(self, instance: Any) -> Any:
+        with span("ser"):
+            return super().to_representation(instance)  # type: ignore[misc]
+
+    def narrow(self, fields: Iterable[str], expand: Iterable[str]) -> None:
+        """Drops the fields that are not requested and expands the requested relations."""
+        own_fields, nested_fields = _group(fields)
+        own_expand, nested_expand = _group(expand)
+        current = self.fields  # type: ignore[attr-defined]
+
+        for name in own_expand:
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                if isinstance(serializer_class, str):
+                    serializer_class = import_string(serializer_class)
+                current[name] = serializer_class(  # type: ignore[operator]
+                    fields=nested_fields.pop(name, None) or (),
+                    expand=nested_expand.pop(name, None) or (),
+                    **{"read_only": True, **options},
+                )
+
+        if own_fields:
+            keep = own_fields | own_expand.intersection(self.expandable_fields)
+            for name in list(current):
+                if name not in keep:
+                    current.pop(name)
+
+        for name in nested_fields.keys() | nested_expand.keys():
+            field = current.get(name)
+            if isinstance(field, serializers.ListSerializer):
+                field = field.child
+            if isinstance(field, DynamicFieldsMixin):
+                field.narrow(nested_fields.get(name, ()), nested_expand.get(name, ()))
+
+
+def _split(value: str | None) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+
+def _group(paths: Iterable[str]) -> tuple[set[str], dict[str, list[str]]]:
+    """Splits dotted paths into the names of this level and the rest per name."""
+    own: set[str] = set()
+    nested: dict[str, list[str]] = defaultdict(list)
+    for path in paths:
+        name, _, rest = path.partition(".")
+        own.add(name)
+        if rest:
+            nested[name].append(rest)
+    return own, nested
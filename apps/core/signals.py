@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generation, is_tenant_model, model_generation
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_model_generation(sender: type[Model], instance: Model, **kwargs: Any) -> None:
+    """
+    Bumps the generation of the saved or deleted model, per tenant for
+    tenant-owned models, which versions cached responses and ETags built on
+    it. Only models of this project are tracked; bulk operations, which do
+    not send signals, must bump the generation themselves.
+
+    The model-wide generation of a tenant-owned model is bumped as well: it
+    versions the responses built without an active tenant, which may span
+    every tenant's rows.
+    """
+    app_config = sender._meta.app_config
+    # Models outside an installed app, like the migration recorder, have no app config.
+    if kwargs.get("raw") or app_config is None or not app_config.name.startswith("apps."):
+        return
+    names = {model_generation(sender)}
+    if is_tenant_model(sender):
+        tenant_id = getattr(instance, "tenant_id", None)
+        names.add(model_generation(sender, tenant_id))
+
+    def bump() -> None:
+        for name in names:
+            bump_generation(name)
+
+    transaction.on_commit(bump, using=kwargs.get("using"))
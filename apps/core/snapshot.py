@@ -0,0 +1,206 @@
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Mapping, NamedTuple
+
+# File layout, all integers little-endian:
+#   header   MAGIC, version (u64), section count (u32)
+#   sections name length (u16), name, entry count (u32), index offset (u64)
+#   indexes  per section, entries sorted by key:
+#            key offset (u64), key length (u32), value offset (u64), value length (u32)
+#   blob     keys (UTF-8) and values (compact JSON)
+MAGIC = b"DRFSNAP1"
+_HEADER = struct.Struct("<8sQI")
+_NAME = struct.Struct("<H")
+_SECTION = struct.Struct("<IQ")
+_ENTRY = struct.Struct("<QIQI")
+
+
+class _State(NamedTuple):
+    mm: mmap.mmap
+    version: int
+    sections: dict[str, tuple[int, int]]
+    stat: tuple[int, int, int]
+
+
+def write_snapshot(path: str | os.PathLike[str], sections: Mapping[str, Mapping[str, Any]], version: int) -> None:
+    """
+    Serializes ``sections`` (name -> {key: JSON-serializable value}) into a
+    snapshot file. The file is written next to ``path`` and moved into place
+    atomically, so readers see either the old or the new version.
+    """
+    encoded = []
+    for name, entries in sections.items():
+        items = sorted(
+            (str(key).encode(), json.dumps(value, separators=(",", ":"), default=str).encode())
+            for key, value in entries.items()
+        )
+        encoded.append((name.encode(), items))
+
+    header_size = _HEADER.size + sum(_NAME.size + len(name) + _SECTION.size for name, _ in encoded)
+    blob_offset = header_size + sum(len(items) for _, items in encoded) * _ENTRY.size
+
+    header = bytearray(_HEADER.pack(MAGIC, version, len(encoded)))
+    index = bytearray()
+    blob = bytearray()
+    for name, items in encoded:
+        header += _NAME.pack(len(name)) + name + _SECTION.pack(len(items), header_size + len(index))
+        for key, value in items:
+            key_offset = blob_offset + len(blob)
+            blob += key
+            index += _ENTRY.pack(key_offset, len(key), key_offset + len(key), len(value))
+            blob += value
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(index)
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def snapshot_lock(path: str | os.PathLike[str], blocking: bool = True) -> Iterator[bool]:
+    """
+    Exclusive lock of the snapshot at ``path`` among the processes of the
+    host, held while it is rebuilt. Yields whether it was acquired, which
+    is always the case when ``blocking``.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class MappedSnapshot:
+    """
+    Read-only view over a snapshot file written by write_snapshot. The file
+    is memory-mapped, so every process on the host shares the same pages and
+    a lookup binary-searches the mapping and decodes only the value it
+    returns.
+
+    At most every ``check_interval`` seconds the file is stat'ed, and a file
+    replaced by a newer build is mapped in its place.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], check_interval: float = 5) -> None:
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._state: _State | None = None
+        self._next_check = 0.0
+
+    @property
+    def version(self) -> int | None:
+        state = self._current()
+        return state.version if state is not None else None
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        state = self._current()
+        if state is None or section not in state.sections:
+            return default
+
+        count, index_offset = state.sections[section]
+        target = key.encode()
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset, value_length = _ENTRY.unpack_from(
+                state.mm, index_offset + middle * _ENTRY.size
+            )
+            candidate = _read(state.mm, key_offset, key_length)
+            if candidate == target:
+                return json.loads(_read(state.mm, value_offset, value_length))
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return default
+
+    def items(self, section: str) -> Iterator[tuple[str, Any]]:
+        state = self._current()
+        if state is None or section not in state.sections:
+            return
+        count, index_offset = state.sections[section]
+        for position in range(count):
+            key_offset, key_length, value_offset, value_length = _ENTRY.unpack_from(
+                state.mm, index_offset + position * _ENTRY.size
+            )
+            yield (
+                _read(state.mm, key_offset, key_length).decode(),
+                json.loads(_read(state.mm, value_offset, value_length)),
+            )
+
+    def refresh(self, force: bool = False) -> bool:
+        """Maps the file again if it was replaced. Returns whether it was."""
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._state = None
+            return False
+
+        stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if not force and self._state is not None and self._state.stat == stat_key:
+            return False
+        self._state = self._load()
+        return True
+
+    def _current(self) -> _State | None:
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._state
+
+    def _load(self) -> _State | None:
+        try:
+            with open(self.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if not stat.st_size:
+                    return None
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        magic, version, section_count = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{self.path} is not a snapshot file")
+
+        sections = {}
+        offset = _HEADER.size
+        for _ in range(section_count):
+            (name_length,) = _NAME.unpack_from(mm, offset)
+            offset += _NAME.size
+            name = _read(mm, offset, name_length).decode()
+            offset += name_length
+            sections[name] = _SECTION.unpack_from(mm, offset)
+            offset += _SECTION.size
+        # The previous mapping is released once no reader references it.
+        return _State(mm, version, sections, (stat.st_ino, stat.st_mtime_ns, stat.st_size))
+
+
+def _read(mm: mmap.mmap, offset: int, length: int) -> bytes:
+    end = offset + length
+    return mm[offset:end]
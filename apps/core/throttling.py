@@ -0,0 +1,174 @@
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from redis.exceptions import RedisError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from apps.business import entitlements
+from apps.tenancies.context import get_current_tenant
+
+from .cache import get_user_ident
+from .metrics import THROTTLE_REJECTIONS
+
+if TYPE_CHECKING:
+    from rest_framework.views import APIView
+
+    from apps.tenancies.models import Tenant
+
+logger = logging.getLogger(__name__)
+
+API_RATE_FEATURE = "api_rate_per_minute"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Sliding-window counter over every scope of a request in one round trip.
+# KEYS[i] is the base key of scope i, ARGV[2i-1] and ARGV[2i] its limit and
+# window in milliseconds. The request is counted in every scope only if all
+# of them allow it. Returns {index of the first denying scope or 0,
+# milliseconds until every denying scope allows a request again}.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local windows = {}
+local denied = 0
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[2 * i - 1])
+    local window = tonumber(ARGV[2 * i])
+    local index = math.floor(now / window)
+    local elapsed = now - index * window
+    local current_key = key .. ":" .. index
+    local current = tonumber(redis.call("GET", current_key) or "0")
+    local previous = tonumber(redis.call("GET", key .. ":" .. (index - 1)) or "0")
+
+    if previous * (window - elapsed) / window + current + 1 > limit then
+        local wait
+        if current + 1 > limit then
+            -- Wait for the next window, until this one weighs little enough.
+            wait = window - elapsed
+            if current > 0 then
+                wait = wait + math.max(0, window * (1 - (limit - 1) / current))
+            end
+        else
+            -- Wait until the previous window has slid out far enough.
+            wait = math.max(0, window - elapsed - window * (limit - 1 - current) / previous)
+        end
+        if denied == 0 then
+            denied = i
+        end
+        retry_after = math.max(retry_after, wait)
+    end
+    windows[i] = {current_key, window}
+end
+
+if denied == 0 then
+    for _, entry in ipairs(windows) do
+        redis.call("INCR", entry[1])
+        redis.call("PEXPIRE", entry[1], entry[2] * 2)
+    end
+end
+return {denied, math.ceil(retry_after)}
+"""
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Single throttle that evaluates every scope that applies to a request
+    in one atomic Redis script:
+
+    - "anon" keyed on the client IP, or "user" keyed on the user (or API key),
+    - the view's ``throttle_scope``, keyed like the above,
+    - "tenant" keyed on the current tenant, at the rate of its plan
+      (the "api_rate_per_minute" feature) or the default "tenant" rate.
+
+    Each scope is a sliding-window counter (two fixed-window counters
+    weighted by the overlap), so memory per key is constant and concurrent
+    workers cannot race. When a request is denied, Retry-After is the wait
+    computed by the script. If Redis is unavailable requests are allowed.
+    """
+
+    THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+
+    def __init__(self) -> None:
+        self.denied_scope: str | None = None
+        self.retry_after: float | None = None
+
+    def allow_request(self, request: Request, view: "APIView") -> bool:
+        scopes = self.get_scopes(request, view)
+        if not scopes:
+            return True
+
+        keys, args = [], []
+        for scope, ident, rate in scopes:
+            limit, window = parse_rate(rate)
+            keys.append(f"{_key_prefix()}:throttle:{scope}:{ident}")
+            args.extend([limit, window * 1000])
+
+        try:
+            denied, retry_after = _sliding_window_script()(keys=keys, args=args)
+        except RedisError as e:
+            logger.warning(f"Throttling skipped, Redis is unavailable: {e}")
+            return True
+
+        if denied:
+            self.denied_scope = scopes[denied - 1][0]
+            self.retry_after = retry_after / 1000
+            THROTTLE_REJECTIONS.inc(scope=self.denied_scope)
+            return False
+        return True
+
+    def wait(self) -> float | None:
+        return self.retry_after
+
+    def get_scopes(self, request: Request, view: "APIView") -> list[tuple[str, str, str]]:
+        """Returns the (scope, ident, rate) triples that apply to the request."""
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            ident = get_user_ident(user)
+            candidates = [("user", ident)]
+        else:
+            ident = self.get_ident(request)
+            candidates = [("anon", ident)]
+
+        throttle_scope = getattr(view, "throttle_scope", None)
+        if throttle_scope:
+            if self.THROTTLE_RATES.get(throttle_scope) is None:
+                raise ImproperlyConfigured(f"No default throttle rate set for '{throttle_scope}' scope")
+            candidates.append((throttle_scope, ident))
+
+        tenant = get_current_tenant()
+        scopes = [(scope, ident, rate) for scope, ident in candidates if (rate := self.THROTTLE_RATES.get(scope))]
+        if tenant is not None and (rate := self.get_tenant_rate(tenant)):
+            scopes.append(("tenant", str(tenant.pk), rate))
+        return scopes
+
+    def get_tenant_rate(self, tenant: "Tenant") -> str | None:
+        per_minute = entitlements.check(tenant, API_RATE_FEATURE)
+        if isinstance(per_minute, int) and not isinstance(per_minute, bool):
+            return f"{per_minute}/minute"
+        return self.THROTTLE_RATES.get("tenant")  # type: ignore[no-any-return]
+
+
+@lru_cache(maxsize=128)
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parses a DRF-style rate ("100/minute", "10/s") into (requests, seconds).
+    """
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+@lru_cache(maxsize=1)
+def _sliding_window_script() -> Any:
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default").register_script(SLIDING_WINDOW_SCRIPT)
+
+
+def _key_prefix() -> str:
+    return settings.CACHES["default"].get("KEY_PREFIX", "")  # type: ignore[no-any-return]
@@ -3,13 +3,32 @@ from typing import Any
 
 from django.core.exceptions import ValidationError
 from django.http import Http404
+from django.utils.timezone import now
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
 from rest_framework.views import exception_handler
 
 logger = logging.getLogger(__name__)
 
 
+def envelope(
+    data: Any = None, meta: dict[str, Any] | None = None, serializer: BaseSerializer | None = None
+) -> dict[str, Any]:
+    """
+    Builds the standard ``{"data": ..., "meta": ...}`` payload. Given a
+    serializer, its representation is used as is, skipping the copy into a
+    ReturnDict/ReturnList that ``serializer.data`` makes.
+    """
+    if serializer is not None:
+        data = serializer.to_representation(serializer.instance)
+    return {
+        "data": data,
+        "meta": {"timestamp": now().isoformat(), "apiVersion": api_settings.DEFAULT_VERSION, **(meta or {})},
+    }
+
+
 def app_exception_handler(exc: Exception, context: dict[str, Any]) -> Response:
     response = exception_handler(exc, context)
 
@@ -24,6 +43,7 @@ def app_exception_handler(exc: Exception, context: dict[str, Any]) -> Response:
         409: "Conflict",
         429: "Too many requests",
         500: "Internal server error",
+        503: "Service unavailable",
     }
 
     error_data = {
@@ -61,7 +81,13 @@ def app_exception_handler(exc: Exception, context: dict[str, Any]) -> Response:
 
     _log_error_safely(exc, context, status_code)
 
-    return Response(error_data, status=status_code, headers={"Content-Type": "application/json"})
+    headers = {"Content-Type": "application/json"}
+    if response is not None:
+        for header in ("Retry-After", "WWW-Authenticate"):
+            if header in response:
+                headers[header] = response[header]
+
+    return Response(error_data, status=status_code, headers=headers)
 
 
 def _simplify_validation_errors(exc: ValidationError) -> dict[str, Any] | str:
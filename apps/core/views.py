@@ -0,0 +1,35 @@
+import ipaddress
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET
+
+from .metrics import collect
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Metrics of every worker in the Prometheus text format. Takes no
+    authentication, only clients in METRICS_ALLOWED_IPS are answered; it is
+    meant to be scraped on the application port, not through the proxy.
+    """
+    if not settings.METRICS_ENABLED or not is_allowed_ip(request.META.get("REMOTE_ADDR", "")):
+        raise Http404
+    return HttpResponse(collect(), content_type=CONTENT_TYPE)
+
+
+def is_allowed_ip(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _allowed_networks())
+
+
+@lru_cache(maxsize=1)
+def _allowed_networks() -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(value, strict=False) for value in settings.METRICS_ALLOWED_IPS)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TenanciesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.tenancies"
+
+    def ready(self) -> None:
+        from apps.tenancies import signals
@@ -1,35 +1,37 @@
 from typing import Any
 
 from django.contrib.auth.backends import BaseBackend
-from django.contrib.auth.models import (
-    AbstractBaseUser,
-    AnonymousUser,
-    Permission,
-)
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
 from django.http import HttpRequest
 
-from .middleware import get_current_tenant
+from apps.authentication.access import get_tenant_permissions
+from apps.core.timing import timed
+
+from .context import get_current_tenant
 
 
 class TenantRolePermissionBackend(BaseBackend):
     """
     Backend that, in addition to normal authentication, loads
     user.user_permissions based on UserTenantRole -> RolePermission.
+    The permission set of each (user, tenant) pair is compiled once and
+    served from cache, see apps.authentication.access. Permissions embedded
+    in a current tenant-scoped token are used without any lookup.
     """
 
     def authenticate(self, request: HttpRequest | None, **kwargs: Any) -> AbstractBaseUser | None:
         return kwargs.get("user")
 
+    @timed("perm")
     def get_user_permissions(self, user_obj: AbstractBaseUser | AnonymousUser, obj: Any | None = None) -> set[str]:
         tenant = get_current_tenant()
-        if not user_obj.is_authenticated:
+        if not user_obj.is_authenticated or tenant is None:
             return set()
 
-        perms = Permission.objects.filter(
-            rolepermission__role__usertenantrole__user=user_obj,
-            rolepermission__role__usertenantrole__tenant=tenant,
-        ).values_list("content_type__app_label", "codename")
-        return {f"{app}.{codename}" for app, codename in perms}
+        token_permissions = getattr(user_obj, "_token_permissions", None)
+        if token_permissions is not None and token_permissions[0] == tenant.pk:
+            return set(token_permissions[1])
+        return set(get_tenant_permissions(user_obj.pk, tenant.pk))
 
     def get_group_permissions(self, user_obj: AbstractBaseUser | AnonymousUser, obj: Any | None = None) -> set[str]:
         return set()
@@ -0,0 +1,78 @@
+from contextvars import ContextVar, Token
+from functools import wraps
+from types import TracebackType
+from typing import Any, Callable, TypeVar
+
+from asgiref.sync import iscoroutinefunction
+
+from .models import Tenant
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current_tenant: ContextVar[Tenant | None] = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant() -> Tenant | None:
+    return _current_tenant.get()
+
+
+def set_current_tenant(tenant: Tenant | None) -> Token[Tenant | None]:
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token: Token[Tenant | None]) -> None:
+    _current_tenant.reset(token)
+
+
+class TenantContext:
+    """
+    Activates a tenant for a block of code. Works as a context manager and
+    as a decorator for both sync and async callables, e.g. in management
+    commands or background jobs:
+
+        with tenant_context(tenant):
+            ...
+
+        @tenant_context(tenant)
+        async def sync_usage() -> None:
+            ...
+    """
+
+    def __init__(self, tenant: Tenant | None) -> None:
+        self.tenant = tenant
+        self._tokens: list[Token[Tenant | None]] = []
+
+    def __enter__(self) -> Tenant | None:
+        self._tokens.append(_current_tenant.set(self.tenant))
+        return self.tenant
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        _current_tenant.reset(self._tokens.pop())
+
+    def __call__(self, func: F) -> F:
+        tenant = self.tenant
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with TenantContext(tenant):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with TenantContext(tenant):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+
+def tenant_context(tenant: Tenant | None) -> TenantContext:
+    return TenantContext(tenant)
@@ -1,27 +1,108 @@
-import threading
+from typing import Awaitable, Callable
 
-from django.http import HttpRequest, HttpResponse
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
-from apps.tenancies.models import Tenant
+from apps.authentication.memberships import get_local_user_memberships, get_user_memberships
+from apps.core.timing import span
+from apps.users.snapshot import get_user_snapshot
 
-_thread_locals = threading.local()
+from .context import reset_current_tenant, set_current_tenant
+from .models import Tenant
+from .resolver import aresolve_tenant, resolve_tenant
 
 
-def get_current_tenant() -> Tenant | None:
-    return getattr(_thread_locals, "tenant", None)
+class TenantMiddleware:
+    """
+    Activates the tenant named by the X-Organization-ID header for the
+    duration of the request. Runs natively in both sync and async chains,
+    so async views do not pay for a thread switch.
 
+    Requests bearing a valid access token of a user who does not belong to
+    that tenant are rejected here, using the cached membership index.
+    """
 
-class TenantMiddleware(MiddlewareMixin):
-    def process_request(self, request: HttpRequest) -> None:
-        tenant_slug = request.headers.get("X-Organization-ID")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]) -> None:
+        self.get_response = get_response
+        self.membership_required = settings.TENANT_MEMBERSHIP_REQUIRED
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with span("tenant"):
+            tenant = resolve_tenant(request.headers.get("X-Organization-ID"))
+            if tenant is not None and self.membership_required:
+                user_id = _token_user_id(request)
+                if user_id is not None and not _is_allowed(user_id, tenant):
+                    return _membership_denied()
+
+        token = set_current_tenant(tenant)
+        try:
+            return self.get_response(request)  # type: ignore[return-value]
+        finally:
+            reset_current_tenant(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with span("tenant"):
+            tenant = await aresolve_tenant(request.headers.get("X-Organization-ID"))
+            if tenant is not None and self.membership_required:
+                user_id = _token_user_id(request)
+                if user_id is not None:
+                    memberships = get_local_user_memberships(user_id)
+                    if memberships is None or tenant.pk not in memberships:
+                        if not await sync_to_async(_is_allowed)(user_id, tenant):
+                            return _membership_denied()
+
+        token = set_current_tenant(tenant)
         try:
-            tenant = Tenant.objects.get(slug=tenant_slug)
-        except Tenant.DoesNotExist:
-            tenant = None
-        _thread_locals.tenant = tenant
-
-    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
-        if hasattr(_thread_locals, "tenant"):
-            delattr(_thread_locals, "tenant")
-        return response
+            return await self.get_response(request)  # type: ignore[no-any-return, misc]
+        finally:
+            reset_current_tenant(token)
+
+
+def _token_user_id(request: HttpRequest) -> int | None:
+    """
+    Returns the user id of a valid bearer access token, or None. Invalid or
+    expired tokens are left for the authentication classes to reject. The
+    validated token is kept on the request, so TenantJWTAuthentication does
+    not verify it again.
+    """
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        token = AccessToken(parts[1])
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+    except (TokenError, KeyError, TypeError, ValueError):
+        return None
+    request.validated_access_token = (parts[1], token)  # type: ignore[attr-defined]
+    return user_id
+
+
+def _is_allowed(user_id: int, tenant: Tenant) -> bool:
+    if tenant.pk in get_user_memberships(user_id):
+        return True
+    user = get_user_snapshot(user_id)
+    return user is not None and user.is_superuser
+
+
+def _membership_denied() -> JsonResponse:
+    error_data = {
+        "error": {
+            "status": 403,
+            "message": "Forbidden",
+            "type": "TenantMembershipRequired",
+            "details": "You do not belong to this organization.",
+        }
+    }
+    return JsonResponse(error_data, status=403)
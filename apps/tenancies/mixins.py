@@ -1,15 +1,20 @@
 from typing import cast
 
 from django.db.models.query import QuerySet
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.serializers import Serializer
 from rest_framework.viewsets import ViewSetMixin
 
-from .middleware import get_current_tenant
+from apps.core.planner import plan_queryset
+
+from .context import get_current_tenant
 
 
 class TenantQuerysetMixin(ViewSetMixin):
     """
     Mixin to filter queryset by the current tenant and assign tenant on object creation.
+    Reads load only the columns and relations the serializer renders, see
+    apps.core.planner.
     """
 
     def get_queryset(self) -> QuerySet:
@@ -17,7 +22,10 @@ class TenantQuerysetMixin(ViewSetMixin):
         tenant = get_current_tenant()
         if tenant is None:
             return queryset.none()
-        return queryset.filter(tenant=tenant)
+        queryset = queryset.filter(tenant=tenant)
+        if self.request.method in SAFE_METHODS:  # type: ignore[attr-defined]
+            queryset = plan_queryset(queryset, self.get_serializer())  # type: ignore[attr-defined]
+        return queryset
 
     def perform_create(self, serializer: Serializer) -> None:
         tenant = get_current_tenant()
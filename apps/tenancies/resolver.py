@@ -0,0 +1,94 @@
+import copy
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import LocalCache, broadcast_invalidation, bump_generation, get_generations, model_generation
+
+from .models import Tenant
+
+LOCAL_NAMESPACE = "tenancies.tenant"
+
+# Stored in both tiers for slugs that do not match any tenant.
+_NOT_FOUND = "__tenant_not_found__"
+_MISSING = object()
+_SLUG_RE = re.compile(r"^[-a-zA-Z0-9_]{1,100}$")
+
+_local_tenants = LocalCache(
+    LOCAL_NAMESPACE,
+    maxsize=settings.TENANT_LOCAL_CACHE_SIZE,
+    ttl=settings.TENANT_LOCAL_CACHE_TTL,
+)
+
+
+def resolve_tenant(slug: str | None) -> Tenant | None:
+    """
+    Resolves a tenant by slug through a worker-local LRU, then the shared
+    Redis cache and finally the database. Unknown slugs are cached as well,
+    so bogus X-Organization-ID headers do not reach the database repeatedly.
+
+    Returns a copy of the cached instance, so callers may modify it safely.
+    """
+    if not slug or not _SLUG_RE.match(slug):
+        return None
+
+    value = _local_tenants.get(slug, _MISSING)
+    if value is _MISSING:
+        value = _fetch(slug)
+        ttl = None
+        if value == _NOT_FOUND:
+            ttl = min(settings.TENANT_LOCAL_CACHE_TTL, settings.TENANT_NEGATIVE_CACHE_TIMEOUT)
+        _local_tenants.set(slug, value, ttl=ttl)
+    return _to_tenant(value)
+
+
+async def aresolve_tenant(slug: str | None) -> Tenant | None:
+    """
+    Async variant of resolve_tenant. Local cache hits are answered inline;
+    only a miss is handed to a worker thread for the Redis/database lookup.
+    """
+    if not slug or not _SLUG_RE.match(slug):
+        return None
+
+    value = _local_tenants.get(slug, _MISSING)
+    if value is _MISSING:
+        return await sync_to_async(resolve_tenant)(slug)
+    return _to_tenant(value)
+
+
+def invalidate_tenant(slug: str) -> None:
+    """
+    Drops a slug from the local cache of every worker. The shared cache is
+    versioned by the tenants generation, so bumping it drops every slug.
+    """
+    bump_generation(model_generation(Tenant))
+    broadcast_invalidation(LOCAL_NAMESPACE, slug)
+
+
+def _to_tenant(value: Tenant | str) -> Tenant | None:
+    if value == _NOT_FOUND:
+        return None
+    return copy.copy(value)  # type: ignore[arg-type]
+
+
+def _fetch(slug: str) -> Tenant | str:
+    # The generation is read before the database, so a row read before an
+    # invalidation is written under a key that is no longer read.
+    (generation,) = get_generations(model_generation(Tenant))
+    key = _cache_key(slug, generation)
+    value = cache.get(key)
+    if value is not None:
+        return value  # type: ignore[no-any-return]
+
+    tenant = Tenant.objects.filter(slug=slug).first()
+    if tenant is None:
+        cache.add(key, _NOT_FOUND, settings.TENANT_NEGATIVE_CACHE_TIMEOUT)
+        return _NOT_FOUND
+    cache.add(key, tenant, settings.TENANT_CACHE_TIMEOUT)
+    return tenant
+
+
+def _cache_key(slug: str, generation: int) -> str:
+    return f"tenancies:tenant:{generation}:slug:{slug}"
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from apps.core.serializers import DynamicFieldsMixin
+
 from .models import Tenant
 
 
-class TenantSerializer(serializers.ModelSerializer):
+class TenantSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Tenant model, used to list tenants
     in the login response.
@@ -0,0 +1,35 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Tenant
+from .resolver import invalidate_tenant
+
+
+@receiver(pre_save, sender=Tenant)
+def remember_previous_slug(sender: type[Tenant], instance: Tenant, **kwargs: Any) -> None:
+    """
+    Keeps the slug stored in the database, so a renamed tenant is also
+    evicted under its old slug.
+    """
+    if instance.pk is None:
+        instance._previous_slug = None  # type: ignore[attr-defined]
+        return
+    instance._previous_slug = (  # type: ignore[attr-defined]
+        Tenant.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_cache(sender: type[Tenant], instance: Tenant, **kwargs: Any) -> None:
+    slugs = {instance.slug, getattr(instance, "_previous_slug", None)}
+
+    def invalidate() -> None:
+        for slug in slugs:
+            if slug:
+                invalidate_tenant(slug)
+
+    transaction.on_commit(invalidate)
@@ -3,13 +3,26 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 from django.contrib.auth import models
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils.translation import gettext_lazy as _
 
 if TYPE_CHECKING:
     from apps.users.models import User
 
 
-class UserManager(models.BaseUserManager["User"]):
+class UserQuerySet(QuerySet["User"]):
+    def update(self, **kwargs: Any) -> int:
+        # update() sends no signal; the cached user snapshots are invalidated here instead.
+        from apps.users.snapshot import invalidate_user_snapshots
+
+        rows = super().update(**kwargs)
+        if rows:
+            transaction.on_commit(invalidate_user_snapshots, using=self.db)
+        return rows
+
+
+class UserManager(models.BaseUserManager.from_queryset(UserQuerySet)):  # type: ignore[misc]
     def create_user(self, email: str, password: str | None = None, **extra_fields: Any) -> "User":
         if not email:
             raise ValueError(_("Email field is required"))
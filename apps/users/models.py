@@ -50,8 +50,12 @@ class User(AbstractBaseUser, BaseAuditModel, PermissionsMixin):  # type: ignore[
         """
         Returns a queryset of all tenants the user is associated with
         through the UserTenantRole model.
-        It uses distinct() to avoid duplicates if a user has multiple
-        roles in the same tenant.
+        The tenant ids come from the cached membership index, so evaluating
+        the queryset is a single primary-key lookup without a subquery.
         """
-        tenant_ids = self.usertenantrole_set.values_list("tenant_id", flat=True)
-        return Tenant.objects.filter(id__in=tenant_ids).distinct()
+        from apps.authentication.memberships import get_user_memberships
+
+        tenant_ids = list(get_user_memberships(self.pk))
+        if not tenant_ids:
+            return Tenant.objects.none()
+        return Tenant.objects.filter(id__in=tenant_ids)
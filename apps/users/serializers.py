@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from apps.core.serializers import DynamicFieldsMixin
+
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     fullName = serializers.CharField(read_only=True)
 
     class Meta:
@@ -0,0 +1,39 @@
+from typing import Any
+
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .snapshot import invalidate_user_snapshot, invalidate_user_snapshots
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot_cache(sender: type[User], instance: User, **kwargs: Any) -> None:
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user_snapshot(user_id))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_user_snapshot_permissions(
+    sender: type[Any], instance: Any, action: str, reverse: bool, **kwargs: Any
+) -> None:
+    # Snapshots hold the permissions granted by ModelBackend.
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, User) and not reverse:
+        user_id = instance.pk
+        transaction.on_commit(lambda: invalidate_user_snapshot(user_id))
+    else:
+        # Changed from the group or permission side: any number of users.
+        transaction.on_commit(invalidate_user_snapshots)
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_group_user_snapshots(sender: type[Group], instance: Group, **kwargs: Any) -> None:
+    # Deleting a group removes its memberships without m2m_changed.
+    transaction.on_commit(invalidate_user_snapshots)
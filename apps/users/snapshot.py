@@ -0,0 +1,194 @@
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_backends
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+
+from apps.core.cache import LocalCache, broadcast_invalidation, bump_generation, get_generations
+
+from .models import User
+
+LOCAL_NAMESPACE = "users.snapshot"
+# Bumped to invalidate every snapshot at once, see invalidate_user_snapshots.
+GENERATION = "users:snapshot"
+
+# Bump when SNAPSHOT_FIELDS or the snapshot values change, so workers never read another layout.
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "updated_at",
+)
+
+_local_snapshots = LocalCache(LOCAL_NAMESPACE, ttl=settings.USER_SNAPSHOT_LOCAL_CACHE_TTL)
+
+
+class UserSnapshot:
+    """
+    Lightweight, read-only stand-in for an authenticated User, built from
+    the handful of columns needed on every request. Any other attribute
+    (relations, password, mfa_secret...) loads the full User row on first
+    access. Pass ``to_user()`` wherever a model instance is required, e.g.
+    when assigning a foreign key.
+
+    Permission checks never load the row: ModelBackend's answer comes from
+    ``model_permissions``, the user's and groups' permissions snapshotted
+    with the columns; other backends are asked as usual.
+    """
+
+    __slots__ = SNAPSHOT_FIELDS + ("model_permissions", "_user", "_token_permissions")
+
+    is_authenticated = True
+    is_anonymous = False
+
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+    updated_at: datetime
+    model_permissions: frozenset[str]
+
+    def __init__(self, values: tuple[Any, ...], model_permissions: frozenset[str]) -> None:
+        for field, value in zip(SNAPSHOT_FIELDS, values):
+            setattr(self, field, value)
+        self.model_permissions = model_permissions
+        self._user: User | None = None
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def get_username(self) -> str:
+        return self.email
+
+    def has_perm(self, perm: str, obj: Any = None) -> bool:
+        if self.is_active and self.is_superuser:
+            return True
+        for backend in get_backends():
+            if isinstance(backend, ModelBackend):
+                # ModelBackend grants no object permissions.
+                if self.is_active and obj is None and perm in self.model_permissions:
+                    return True
+            elif hasattr(backend, "has_perm"):
+                try:
+                    if backend.has_perm(self, perm, obj):
+                        return True
+                except PermissionDenied:
+                    return False
+        return False
+
+    def has_perms(self, perm_list: list[str], obj: Any = None) -> bool:
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label: str) -> bool:
+        if self.is_active and self.is_superuser:
+            return True
+        for backend in get_backends():
+            if isinstance(backend, ModelBackend):
+                if self.is_active and any(perm.partition(".")[0] == app_label for perm in self.model_permissions):
+                    return True
+            elif hasattr(backend, "has_module_perms"):
+                try:
+                    if backend.has_module_perms(self, app_label):
+                        return True
+                except PermissionDenied:
+                    return False
+        return False
+
+    def to_user(self) -> User:
+        if self._user is None:
+            self._user = User.objects.get(pk=self.id)
+        return self._user
+
+    def __getattr__(self, name: str) -> Any:
+        # Private names (per-object caches set by auth backends, unset slots)
+        # never trigger a database load.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.to_user(), name)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (UserSnapshot, User)):
+            return self.id == other.pk
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __str__(self) -> str:
+        return self.email
+
+
+def get_user_snapshot(user_id: Any) -> UserSnapshot | None:
+    """
+    Returns the snapshot of a user from the worker-local cache, Redis or,
+    on a miss, a narrow query for the columns and one for the permissions.
+    Returns None if the user is gone.
+
+    Snapshots are invalidated when a user is saved or deleted, updated
+    through User.objects, or their groups or permissions change (see
+    apps.users.signals); writes bypassing the ORM show after
+    USER_SNAPSHOT_CACHE_TIMEOUT.
+    """
+    key = str(user_id)
+    snapshot = _local_snapshots.get(key)
+    if snapshot is None:
+        (generation,) = get_generations(GENERATION)
+        cache_key = _cache_key(key, generation)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            values = User.objects.filter(pk=user_id).values_list(*SNAPSHOT_FIELDS).first()
+            if values is None:
+                return None
+            snapshot = (values, _model_permissions(values))
+            cache.set(cache_key, snapshot, settings.USER_SNAPSHOT_CACHE_TIMEOUT)
+        _local_snapshots.set(key, snapshot)
+    return UserSnapshot(*snapshot)
+
+
+def invalidate_user_snapshot(user_id: Any) -> None:
+    key = str(user_id)
+    (generation,) = get_generations(GENERATION)
+    cache.delete(_cache_key(key, generation))
+    broadcast_invalidation(LOCAL_NAMESPACE, key)
+
+
+def invalidate_user_snapshots() -> None:
+    """Invalidates the snapshots of every user, e.g. after a bulk update."""
+    bump_generation(GENERATION)
+    broadcast_invalidation(LOCAL_NAMESPACE)
+
+
+def _model_permissions(values: tuple[Any, ...]) -> frozenset[str]:
+    """The permissions ModelBackend grants the user of ``values``, through the user or their groups."""
+    fields = dict(zip(SNAPSHOT_FIELDS, values))
+    if not fields["is_active"] or fields["is_superuser"]:
+        return frozenset()
+    user_id = fields["id"]
+    permissions = (
+        Permission.objects.filter(Q(user=user_id) | Q(group__user=user_id))
+        .values_list("content_type__app_label", "codename")
+        .distinct()
+    )
+    return frozenset(f"{app_label}.{codename}" for app_label, codename in permissions)
+
+
+def _cache_key(user_id: str, generation: int) -> str:
+    return f"users:snapshot:v{SNAPSHOT_VERSION}:{generation}:{user_id}"
@@ -0,0 +1,49 @@
+import logging
+from contextvars import ContextVar, Token
+from typing import Any
+
+# Attributes of the request added to every record logged while it is handled.
+CONTEXT_FIELDS = ("user", "ip", "request_id", "method", "path")
+
+_request_context: ContextVar[dict[str, Any] | None] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> dict[str, Any] | None:
+    return _request_context.get()
+
+
+def set_request_context(context: dict[str, Any]) -> Token[dict[str, Any] | None]:
+    return _request_context.set(context)
+
+
+def reset_request_context(token: Token[dict[str, Any] | None]) -> None:
+    _request_context.reset(token)
+
+
+def update_request_context(**values: Any) -> None:
+    """Updates the context of the current request, e.g. once the user is authenticated."""
+    context = _request_context.get()
+    if context is not None:
+        context.update(values)
+
+
+def install_record_factory() -> None:
+    """
+    Wraps the log record factory so records created while a request is
+    handled carry its context as attributes. The factory only runs for
+    records whose level is enabled, and passing the same keys in ``extra``
+    raises KeyError, as for any other record attribute.
+    """
+    base_factory = logging.getLogRecordFactory()
+    if getattr(base_factory, "injects_request_context", False):
+        return
+
+    def record_factory(*args: Any, **kwargs: Any) -> logging.LogRecord:
+        record = base_factory(*args, **kwargs)
+        context = _request_context.get()
+        if context is not None:
+            record.__dict__.update(context)
+        return record
+
+    record_factory.injects_request_context = True  # type: ignore[attr-defined]
+    logging.setLogRecordFactory(record_factory)
@@ -1,6 +1,13 @@
 import logging
 import os
+from datetime import UTC, datetime
 from logging.handlers import RotatingFileHandler
+from typing import Any
+
+import orjson
+
+# Attributes every record has, the rest was added by extra or the request context.
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
 
 
 class SafeRotatingFileHandler(RotatingFileHandler):
@@ -24,22 +31,56 @@ class SafeRotatingFileHandler(RotatingFileHandler):
 
 
 class SafeFormatter(logging.Formatter):
+    """Text formatter that fills the request attributes missing on a record, e.g. outside a request."""
+
+    defaults = (
+        ("user", "!MISSING_user!"),
+        ("ip", "!MISSING_ip!"),
+        ("request_id", "!MISSING_request_id!"),
+        ("method", "!MISSING_method!"),
+        ("path", "!MISSING_path!"),
+        ("status_code", "!MISSING_status_code!"),
+        ("duration", 0.0),
+    )
+
     def format(self, record: logging.LogRecord) -> str:
-        try:
-            return super().format(record)
-        except (KeyError, ValueError):
-            for key, default in [
-                ("user", "!MISSING_user!"),
-                ("ip", "!MISSING_ip!"),
-                ("request_id", "!MISSING_request_id!"),
-                ("method", "!MISSING_method!"),
-                ("path", "!MISSING_path!"),
-                ("status_code", "!MISSING_status_code!"),
-                ("duration", 0.0),
-            ]:
-                if not hasattr(record, key):
-                    setattr(record, key, default)
-            return super().format(record)
+        attributes = record.__dict__
+        for key, default in self.defaults:
+            attributes.setdefault(key, default)
+        return super().format(record)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON line in a single pass: the standard fields,
+    then every attribute added by ``extra`` or the request context, then the
+    formatted exception and stack, if any. Values orjson cannot serialize
+    natively are rendered with str().
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.thread,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z).decode()
 
 
 class MaxLevelFilter(logging.Filter):
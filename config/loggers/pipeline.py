@@ -0,0 +1,212 @@
+import atexit
+import logging
+import logging.config
+import os
+import pickle  # nosec B403
+import queue
+import signal
+import socketserver
+import struct
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener, SocketHandler
+from multiprocessing import Process
+from typing import Any, Callable
+
+# Records handled by a listener per wake-up.
+BATCH_SIZE = 256
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Front end of the non-blocking log pipeline. emit() only puts the record
+    on a bounded in-memory queue; a listener thread of this process hands
+    queued records in batches to ``handlers``, the names of other handlers
+    in LOGGING. When the queue is full the record is dropped and counted
+    instead of blocking the request; ``on_drop``, if given, is called with
+    each dropped record, e.g. to count it in a metric.
+
+    dictConfig creates handlers in the order of their names, so the target
+    handlers' names must sort before this one's. The listener starts on the
+    first record of each process, so it also works in workers forked after
+    logging was configured.
+    """
+
+    def __init__(
+        self,
+        handlers: list[str],
+        queue_size: int = 10000,
+        respect_handler_level: bool = True,
+        on_drop: Callable[[logging.LogRecord], None] | None = None,
+    ) -> None:
+        super().__init__(queue.Queue(queue_size))
+        # Handlers no logger uses are only referenced weakly by the logging module.
+        self.handlers = [_get_handler(name) for name in handlers]
+        self.respect_handler_level = respect_handler_level
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._listener: QueueListener | None = None
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so formatting is left to it.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop(record)
+
+    def close(self) -> None:
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+        super().close()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = BatchQueueListener(
+                self.queue, *self.handlers, respect_handler_level=self.respect_handler_level  # type: ignore[arg-type]
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.close)
+
+
+class BatchQueueListener(QueueListener):
+    """QueueListener that drains up to BATCH_SIZE waiting records per wake-up."""
+
+    def _monitor(self) -> None:
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        while True:
+            batch = [q.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    break
+                self.handle(record)
+            if has_task_done:
+                for _ in batch:
+                    q.task_done()
+            if batch[-1] is self._sentinel:
+                return
+
+
+class WriterSocketHandler(SocketHandler):
+    """
+    SocketHandler shipping records to the log writer process. Attributes
+    that cannot be pickled, such as the ``request`` Django adds to the
+    records of django.request, are sent as their str(), instead of the whole
+    record being dropped. Reconnects within retryMax seconds once a
+    restarted writer listens again; records emitted until then are lost.
+    """
+
+    retryMax = 2.0
+
+    def __init__(self, socket_path: str) -> None:
+        super().__init__(socket_path, None)
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        if record.exc_info:
+            # Puts the traceback text in record.exc_text.
+            self.format(record)
+        # The message is sent formatted and the exception as text, as by SocketHandler.
+        attributes = dict(record.__dict__, msg=record.getMessage(), args=None, exc_info=None)
+        attributes.pop("message", None)
+        try:
+            payload = pickle.dumps(attributes, 1)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            payload = pickle.dumps({key: _picklable(value) for key, value in attributes.items()}, 1)
+        return struct.pack(">L", len(payload)) + payload
+
+
+def _picklable(value: Any) -> Any:
+    try:
+        pickle.dumps(value, 1)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return str(value)
+    return value
+
+
+class _RecordStreamHandler(socketserver.StreamRequestHandler):
+    """Reads records framed like logging.handlers.SocketHandler sends them."""
+
+    server: "LogWriterServer"
+
+    def handle(self) -> None:
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                return
+            (length,) = struct.unpack(">L", header)
+            payload = self.rfile.read(length)
+            if len(payload) < length:
+                return
+            # The socket is only reachable by the user running the workers.
+            record = logging.makeLogRecord(pickle.loads(payload))  # nosec B301
+            self.server.records.put(record)
+
+
+class LogWriterServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, handlers: list[logging.Handler]) -> None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RecordStreamHandler)
+        os.chmod(socket_path, 0o600)
+        self.records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self.listener = BatchQueueListener(
+            self.records, *handlers, respect_handler_level=True  # type: ignore[arg-type]
+        )
+
+
+def run_log_writer(socket_path: str, logging_config: dict[str, Any], handlers: list[str]) -> None:
+    """
+    Body of the log writer process: receives records from the workers over
+    a Unix socket and is the only process that writes, and rotates, the log
+    files configured by ``logging_config``.
+    """
+    # Stop on SIGTERM through SystemExit, so the records still queued are written.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logging.config.dictConfig(logging_config)
+    server = LogWriterServer(socket_path, [_get_handler(name) for name in handlers])
+    server.listener.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.listener.stop()
+        logging.shutdown()
+
+
+def start_log_writer(socket_path: str, logging_config: dict[str, Any], handlers: list[str]) -> Process:
+    """Starts the log writer process. Nothing restarts it by itself, see gunicorn_conf.py."""
+    process = Process(
+        target=run_log_writer, args=(socket_path, logging_config, handlers), name="log-writer", daemon=True
+    )
+    process.start()
+    return process
+
+
+def _get_handler(name: str) -> logging.Handler:
+    handler = logging.getHandlerByName(name) if hasattr(logging, "getHandlerByName") else logging._handlers.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown log handler '{name}', or it is configured after the handler using it")
+    return handler  # type: ignore[no-any-return]
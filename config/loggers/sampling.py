@@ -0,0 +1,91 @@
+import hashlib
+import logging
+from contextvars import ContextVar, Token
+from fnmatch import fnmatchcase
+
+# Minimum level of the records logged while the current request is handled.
+_request_level: ContextVar[int] = ContextVar("request_level", default=logging.NOTSET)
+
+
+def set_request_level(level: int) -> Token[int]:
+    return _request_level.set(level)
+
+
+def reset_request_level(token: Token[int]) -> None:
+    _request_level.reset(token)
+
+
+class RequestLevelFilter(logging.Filter):
+    """
+    Drops records below the level set for the current request, see
+    AccessLogSampler. Records logged outside a request pass. Belongs on the
+    handlers records reach first, the request context is not known in the
+    listener thread of the queue pipeline.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= _request_level.get()
+
+
+class AccessLogSampler:
+    """
+    Decides which requests log below WARNING. The rate of a request is the
+    one configured for its tenant, else for the first route pattern (a glob
+    on the path) that matches, else ``rate``. The decision is a hash of the
+    request id, so every line of a request is kept or dropped together and
+    the same request is sampled alike by every process. A request that is
+    sampled out logs WARNING and above only.
+
+    ``route_levels`` set a minimum level per route pattern, which is capped
+    at WARNING so errors are always logged.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        route_rates: dict[str, float] | None = None,
+        tenant_rates: dict[str, float] | None = None,
+        route_levels: dict[str, int] | None = None,
+    ) -> None:
+        self.rate = rate
+        self.route_rates = route_rates or {}
+        self.tenant_rates = tenant_rates or {}
+        self.route_levels = {pattern: min(level, logging.WARNING) for pattern, level in (route_levels or {}).items()}
+
+    def get_rate(self, path: str, tenant: str | None) -> float:
+        if tenant is not None and tenant in self.tenant_rates:
+            return self.tenant_rates[tenant]
+        for pattern, rate in self.route_rates.items():
+            if fnmatchcase(path, pattern):
+                return rate
+        return self.rate
+
+    def get_level(self, request_id: str, path: str, tenant: str | None) -> int:
+        """Minimum level of the records of a request."""
+        if not is_sampled(request_id, self.get_rate(path, tenant)):
+            return logging.WARNING
+        for pattern, level in self.route_levels.items():
+            if fnmatchcase(path, pattern):
+                return level
+        return logging.NOTSET
+
+
+def is_sampled(request_id: str, rate: float) -> bool:
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    digest = hashlib.blake2b(request_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest) < rate * 2**64
+
+
+def parse_mapping(value: str) -> dict[str, str]:
+    """Parses "key=value,key=value" settings, e.g. LOG_SAMPLE_ROUTES."""
+    mapping = {}
+    for item in value.split(","):
+        if item.strip():
+            key, separator, item_value = item.rpartition("=")
+            if not separator or not key.strip():
+                raise ValueError(f"Expected key=value, got '{item.strip()}'")
+            mapping[key.strip()] = item_value.strip()
+    return mapping
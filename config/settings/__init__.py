@@ -5,6 +5,7 @@ from ._caches import *
 from ._database import *
 from ._i18n_timezone import *
 from ._logging import *
+from ._metrics import *
 from ._rest_framework import *
 from ._security import *
 from ._static_media import *
@@ -37,3 +37,8 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": True,
 }
+
+LOGIN_HASHING_WORKERS = config("LOGIN_HASHING_WORKERS", default=4, cast=int)
+LOGIN_HASHING_QUEUE_SIZE = config("LOGIN_HASHING_QUEUE_SIZE", default=16, cast=int)
+LOGIN_ADMISSION_TIMEOUT = config("LOGIN_ADMISSION_TIMEOUT", default=0.5, cast=float)
+LOGIN_RETRY_AFTER = config("LOGIN_RETRY_AFTER", default=1, cast=int)
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from decouple import config
 
 CACHES = {
@@ -18,3 +20,47 @@ CACHES = {
         "TIMEOUT": config("CACHE_TIMEOUT", default=300, cast=int),
     },
 }
+
+LOCAL_CACHE_MAXSIZE = config("LOCAL_CACHE_MAXSIZE", default=1024, cast=int)
+LOCAL_CACHE_TTL = config("LOCAL_CACHE_TTL", default=30, cast=float)
+LOCAL_CACHE_INVALIDATION_ENABLED = config("LOCAL_CACHE_INVALIDATION_ENABLED", default=True, cast=bool)
+# Seconds between pings of the idle invalidation subscription.
+LOCAL_CACHE_HEALTH_CHECK_INTERVAL = config("LOCAL_CACHE_HEALTH_CHECK_INTERVAL", default=15, cast=float)
+
+TENANT_CACHE_TIMEOUT = config("TENANT_CACHE_TIMEOUT", default=3600, cast=int)
+TENANT_NEGATIVE_CACHE_TIMEOUT = config("TENANT_NEGATIVE_CACHE_TIMEOUT", default=60, cast=int)
+TENANT_LOCAL_CACHE_SIZE = config("TENANT_LOCAL_CACHE_SIZE", default=2048, cast=int)
+TENANT_LOCAL_CACHE_TTL = config("TENANT_LOCAL_CACHE_TTL", default=30, cast=float)
+
+PERMISSION_CACHE_TIMEOUT = config("PERMISSION_CACHE_TIMEOUT", default=3600, cast=int)
+PERMISSION_LOCAL_CACHE_TTL = config("PERMISSION_LOCAL_CACHE_TTL", default=30, cast=float)
+
+USER_SNAPSHOT_CACHE_TIMEOUT = config("USER_SNAPSHOT_CACHE_TIMEOUT", default=900, cast=int)
+USER_SNAPSHOT_LOCAL_CACHE_TTL = config("USER_SNAPSHOT_LOCAL_CACHE_TTL", default=30, cast=float)
+
+MEMBERSHIP_CACHE_TIMEOUT = config("MEMBERSHIP_CACHE_TIMEOUT", default=3600, cast=int)
+MEMBERSHIP_LOCAL_CACHE_TTL = config("MEMBERSHIP_LOCAL_CACHE_TTL", default=30, cast=float)
+
+ENTITLEMENT_CACHE_TIMEOUT = config("ENTITLEMENT_CACHE_TIMEOUT", default=3600, cast=int)
+ENTITLEMENT_LOCAL_CACHE_TTL = config("ENTITLEMENT_LOCAL_CACHE_TTL", default=30, cast=float)
+
+CATALOG_SNAPSHOT_PATH = config(
+    "CATALOG_SNAPSHOT_PATH", default=str(Path(__file__).resolve().parent.parent.parent / "var" / "catalog.snapshot")
+)
+CATALOG_SNAPSHOT_CHECK_INTERVAL = config("CATALOG_SNAPSHOT_CHECK_INTERVAL", default=5, cast=float)
+
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+# Bump to drop every cached response, e.g. after changing a serializer.
+RESPONSE_CACHE_VERSION = config("RESPONSE_CACHE_VERSION", default="1")
+
+API_KEY_LOCAL_CACHE_SIZE = config("API_KEY_LOCAL_CACHE_SIZE", default=4096, cast=int)
+API_KEY_LOCAL_CACHE_TTL = config("API_KEY_LOCAL_CACHE_TTL", default=60, cast=float)
+
+# Public catalog endpoints: URLs carrying the current catalog version (?v=) are
+# immutable and cached for long, the others for a short time.
+CATALOG_CACHE_MAX_AGE = config("CATALOG_CACHE_MAX_AGE", default=60, cast=int)
+CATALOG_VERSIONED_CACHE_MAX_AGE = config("CATALOG_VERSIONED_CACHE_MAX_AGE", default=86400, cast=int)
+EDGE_CACHE_STALE_WHILE_REVALIDATE = config("EDGE_CACHE_STALE_WHILE_REVALIDATE", default=30, cast=int)
+# PURGE endpoint of the edge cache, e.g. http://nginx/purge; empty disables purging.
+EDGE_CACHE_PURGE_URL = config("EDGE_CACHE_PURGE_URL", default="")
+EDGE_CACHE_PURGE_TIMEOUT = config("EDGE_CACHE_PURGE_TIMEOUT", default=2, cast=float)
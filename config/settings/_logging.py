@@ -6,11 +6,15 @@ from typing import Any
 from decouple import config
 from django.core.exceptions import ImproperlyConfigured
 
+from config.loggers.context import install_record_factory
 from config.loggers.loggers import (
+    JSONFormatter,
     MaxLevelFilter,
     SafeFormatter,
     SafeRotatingFileHandler,
 )
+from config.loggers.pipeline import QueueListenerHandler, WriterSocketHandler
+from config.loggers.sampling import RequestLevelFilter, parse_mapping
 
 BASE_ROOT = Path(__file__).resolve().parent.parent.parent
 LOG_DIR = BASE_ROOT / "logs"
@@ -21,6 +25,13 @@ try:
 except OSError as e:
     raise ImproperlyConfigured(f"Could not create/configure the logs directory: {e}")
 
+# Format of the log files: json (one object per line) or verbose (text).
+LOG_FORMAT = config("LOG_FORMAT", default="json")
+if LOG_FORMAT not in ("json", "verbose"):
+    raise ImproperlyConfigured(f"Unknown LOG_FORMAT '{LOG_FORMAT}', expected json or verbose")
+
+# Records logged while a request is handled carry its context, see LoggingMiddleware.
+install_record_factory()
 
 LOGGING: dict[str, Any] = {
     "version": 1,
@@ -39,6 +50,9 @@ LOGGING: dict[str, Any] = {
             ),
             "style": "{",
         },
+        "json": {
+            "()": JSONFormatter,
+        },
     },
     "filters": {
         "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
@@ -46,6 +60,7 @@ LOGGING: dict[str, Any] = {
             "()": MaxLevelFilter,
             "max_level": logging.ERROR,
         },
+        "request_level": {"()": RequestLevelFilter},
     },
     "handlers": {
         "file": {
@@ -53,7 +68,7 @@ LOGGING: dict[str, Any] = {
             "backupCount": 5,
             "encoding": "utf-8",
             "filename": LOG_DIR / "app.log",
-            "formatter": "verbose",
+            "formatter": LOG_FORMAT,
             "level": "DEBUG",
             "maxBytes": 1024 * 1024 * 5,  # 5 MB
             "filters": ["below_error"],
@@ -63,7 +78,7 @@ LOGGING: dict[str, Any] = {
             "backupCount": 5,
             "encoding": "utf-8",
             "filename": LOG_DIR / "errors.log",
-            "formatter": "verbose",
+            "formatter": LOG_FORMAT,
             "level": "ERROR",
             "maxBytes": 1024 * 1024 * 5,
         },
@@ -107,3 +122,84 @@ else:
     )
     LOGGING["loggers"]["django.request"]["filters"] = ["require_debug_false"]
     LOGGING["loggers"]["apps"]["filters"] = ["require_debug_false"]
+
+# How records reach the log files:
+#   sync   every process writes the files itself, in the logging call.
+#   queue  logging calls only enqueue; a thread per process writes the files.
+#   writer logging calls only enqueue; a thread per process ships records over a
+#          Unix socket to the log writer process started by gunicorn_conf.py,
+#          the only process that writes and rotates the files. The master restarts
+#          a writer that died when it next forks a worker; records sent meanwhile
+#          are lost.
+# In both queue modes, records that do not fit in the queue of LOG_QUEUE_SIZE are
+# dropped and counted in the log_records_dropped_total metric.
+LOG_PIPELINE = config("LOG_PIPELINE", default="sync")
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+LOG_WRITER_SOCKET = config("LOG_WRITER_SOCKET", default=str(LOG_DIR / "writer.sock"))
+FILE_HANDLERS = ["file", "error_file"]
+
+# Configuration of the log writer process.
+LOG_WRITER_LOGGING: dict[str, Any] = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": LOGGING["formatters"],
+    "filters": LOGGING["filters"],
+    "handlers": {name: LOGGING["handlers"][name] for name in FILE_HANDLERS},
+}
+
+if LOG_PIPELINE in ("queue", "writer"):
+    if LOG_PIPELINE == "writer":
+        for name in FILE_HANDLERS:
+            del LOGGING["handlers"][name]
+        LOGGING["handlers"]["log_writer"] = {
+            "()": WriterSocketHandler,
+            "socket_path": LOG_WRITER_SOCKET,
+        }
+        targets = ["log_writer"]
+    else:
+        targets = FILE_HANDLERS
+    LOGGING["handlers"]["queue"] = {
+        "()": QueueListenerHandler,
+        "handlers": targets,
+        "queue_size": LOG_QUEUE_SIZE,
+        # Dropped records are counted in log_records_dropped_total, see apps.core.metrics.
+        "on_drop": "ext://apps.core.metrics.count_dropped_log_record",
+    }
+    for logger_config in [LOGGING["root"], *LOGGING["loggers"].values()]:
+        logger_config["handlers"] = [
+            "queue",
+            *(name for name in logger_config["handlers"] if name not in FILE_HANDLERS),
+        ]
+elif LOG_PIPELINE != "sync":
+    raise ImproperlyConfigured(f"Unknown LOG_PIPELINE '{LOG_PIPELINE}', expected sync, queue or writer")
+
+# Sampling of the logs of requests below WARNING, see AccessLogSampler. Rates are
+# between 0 and 1, routes are globs on the path and tenants are slugs, e.g.
+#   LOG_SAMPLE_ROUTES=/api/*/catalog/*=0.01,/api/*/health/=0
+#   LOG_ROUTE_LEVELS=/api/*/billing/*=DEBUG
+# Errors and requests slower than LOG_SLOW_REQUEST_MS are always logged.
+try:
+    LOG_SAMPLE_RATE = config("LOG_SAMPLE_RATE", default=1.0, cast=float)
+    LOG_SAMPLE_ROUTES = {
+        pattern: float(rate) for pattern, rate in config("LOG_SAMPLE_ROUTES", default="", cast=parse_mapping).items()
+    }
+    LOG_SAMPLE_TENANTS = {
+        slug: float(rate) for slug, rate in config("LOG_SAMPLE_TENANTS", default="", cast=parse_mapping).items()
+    }
+    LOG_ROUTE_LEVELS = {
+        pattern: logging.getLevelNamesMapping()[level.upper()]
+        for pattern, level in config("LOG_ROUTE_LEVELS", default="", cast=parse_mapping).items()
+    }
+except (KeyError, ValueError) as e:
+    raise ImproperlyConfigured(f"Invalid log sampling setting: {e}")
+LOG_SLOW_REQUEST_MS = config("LOG_SLOW_REQUEST_MS", default=1000, cast=float)
+
+# The request level filter goes on the handler records reach first.
+front_handlers = ["queue"] if LOG_PIPELINE in ("queue", "writer") else ["file"]
+for name in front_handlers:
+    LOGGING["handlers"][name].setdefault("filters", []).append("request_level")
+
+# Per-phase timings of requests (tenant, auth, perm, db, ser, render), added to
+# the access log and, with SERVER_TIMING_HEADER, sent as a Server-Timing header.
+SERVER_TIMING = config("SERVER_TIMING", default=False, cast=bool)
+SERVER_TIMING_HEADER = config("SERVER_TIMING_HEADER", default=True, cast=bool)
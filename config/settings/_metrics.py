@@ -0,0 +1,11 @@
+from pathlib import Path
+
+from decouple import Csv, config
+
+# Request, database, cache and throttling metrics, served at /metrics to the
+# addresses (or networks) in METRICS_ALLOWED_IPS, see apps.core.metrics. Every
+# process writes its values to a file in METRICS_DIR.
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_DIR = config("METRICS_DIR", default=str(Path(__file__).resolve().parent.parent.parent / "var" / "metrics"))
+METRICS_ALLOWED_IPS = config("METRICS_ALLOWED_IPS", default="127.0.0.1,::1", cast=Csv())
+METRICS_MAX_SERIES = config("METRICS_MAX_SERIES", default=1000, cast=int)
@@ -1,11 +1,24 @@
 from decouple import config
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "apps.authentication.authentication.TenantJWTAuthentication",
+        "apps.authentication.authentication.ApiKeyAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.KeysetPagination",
     "PAGE_SIZE": config("PAGE_SIZE", default=20, cast=int),
     "MAX_PAGE_SIZE": config("MAX_PAGE_SIZE", default=100, cast=int),
+    "PAGINATION_COUNT_CAP": config("PAGINATION_COUNT_CAP", default=10000, cast=int),
     #    "DEFAULT_FILTER_BACKENDS": (
     #        "django_filters.rest_framework.DjangoFilterBackend",
     #        "rest_framework.filters.SearchFilter",
@@ -14,14 +27,11 @@ REST_FRAMEWORK = {
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.URLPathVersioning",
     "DEFAULT_VERSION": config("API_DEFAULT_VERSION", default="v1"),
     "ALLOWED_VERSIONS": config("API_ALLOWED_VERSIONS", default="v1", cast=lambda v: v.split(",")),
-    "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
-    ),
+    "DEFAULT_THROTTLE_CLASSES": ("apps.core.throttling.SlidingWindowThrottle",),
     "DEFAULT_THROTTLE_RATES": {
         "anon": config("THROTTLE_RATE_ANON", default="200/day"),
         "user": config("THROTTLE_RATE_USER", default="2000/day"),
+        "tenant": config("THROTTLE_RATE_TENANT", default="20000/day"),
         "sensitive": config("THROTTLE_RATE_SENSITIVE", default="10/hour"),
     },
     "EXCEPTION_HANDLER": "apps.core.utils.app_exception_handler",
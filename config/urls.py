@@ -7,6 +7,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from apps.core.views import metrics
+
 urlpatterns = [
     path("api/schema", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -20,7 +22,9 @@ urlpatterns = [
         name="redoc",
     ),
     path("api/v1/auth/", include("apps.authentication.urls")),
+    re_path(r"^api/(?P<version>[^/]+)/catalog/", include("apps.business.urls", namespace="catalog")),
     re_path(r"^api/(?P<version>[^/]+)/users", include("apps.users.urls", namespace="users")),
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -14,3 +14,50 @@ errorlog = "logs/gunicorn-error.log"
 capture_output = True
 max_requests = 1000
 max_requests_jitter = 50
+
+
+def on_starting(server):
+    # Metrics of a previous run would be added to the new workers' ones.
+    from config.settings._metrics import METRICS_DIR, METRICS_ENABLED
+
+    if METRICS_ENABLED:
+        from apps.core.metrics import clear_metrics
+
+        clear_metrics(METRICS_DIR)
+
+    # With LOG_PIPELINE=writer, workers ship their log records to a single
+    # writer process, the only one that writes and rotates the log files.
+    from config.settings._logging import FILE_HANDLERS, LOG_PIPELINE, LOG_WRITER_LOGGING, LOG_WRITER_SOCKET
+
+    if LOG_PIPELINE == "writer":
+        from config.loggers.pipeline import start_log_writer
+
+        server.log_writer = start_log_writer(LOG_WRITER_SOCKET, LOG_WRITER_LOGGING, FILE_HANDLERS)
+
+
+def pre_fork(server, worker):
+    # Nothing else restarts a log writer that died; its workers reconnect to the new one.
+    log_writer = getattr(server, "log_writer", None)
+    if log_writer is not None and not log_writer.is_alive():
+        from config.loggers.pipeline import start_log_writer
+        from config.settings._logging import FILE_HANDLERS, LOG_WRITER_LOGGING, LOG_WRITER_SOCKET
+
+        server.log.warning("Log writer exited with code %s, restarting it", log_writer.exitcode)
+        server.log_writer = start_log_writer(LOG_WRITER_SOCKET, LOG_WRITER_LOGGING, FILE_HANDLERS)
+
+
+def on_exit(server):
+    log_writer = getattr(server, "log_writer", None)
+    if log_writer is not None:
+        log_writer.terminate()
+        log_writer.join(5)
+
+
+def child_exit(server, worker):
+    # Fold the metrics of an exited worker into the archive file.
+    from config.settings._metrics import METRICS_DIR, METRICS_ENABLED
+
+    if METRICS_ENABLED:
+        from apps.core.metrics import mark_process_dead
+
+        mark_process_dead(METRICS_DIR, worker.pid)